@@ -30,7 +30,7 @@
 #  _version       |                             .  _node ------------->| XMLNODE   |
 #  _mindmap       |                             .  _branch ---|        '-----------'
 #  _root          |                                                          ^
-#  _parentmap     |                                |                         |
+#                 |                                |                         |
 #                 v                                |                         |
 #  |            .---.  .----.   .----. .----. .--------.                     |
 #  '----------- | M |  | R  +-+-+ N  +-+ N  +-+ N      +- ...                |
@@ -63,27 +63,34 @@
 from __future__ import print_function
 import argparse
 import datetime
+import functools
 import os
 import re
 import sys
+import time
 import io
+import collections.abc
+import itertools
 import logging
+import weakref
 
 # xml format
 try:
     import lxml.etree as ET
+    # precompiled XPath expressions
+    XPATH_TYPE_ATTRIBUTE        = ET.XPath("attribute[@NAME='type' and @VALUE=$v]")
+    XPATH_ALL_TYPE_ATTRIBUTES   = ET.XPath(".//attribute[@NAME='type' and @VALUE]")
+    XPATH_ALL_NODES_WITH_TEXT   = ET.XPath(".//node[@TEXT]")
+    XPATH_CHILD_BY_TEXT         = ET.XPath("node[@TEXT=$text]")
+    XPATH_ARROWLINKS_TO         = ET.XPath("arrowlink[@DESTINATION=$id]")
+    XPATH_ALL_ARROWLINKS_TO     = ET.XPath(".//arrowlink[@DESTINATION=$id]")
+    XPATH_STYLES                = ET.XPath("stylenode[@TEXT]")
+    XPATH_STYLE_NAMES           = ET.XPath("stylenode/@TEXT")
 except:
     print("at this point, lxml package is not available. shouldn't be a problem, though.")
 
-# html format
-try:
-    import html2text
-except:
-    print("at this point, html2text package is not available. shouldn't be a problem, though.")
-
-
 # version
-__version__         = '0.10.0'
+__version__         = '0.11.0'
 
 # BUILTIN ICONS
 ICON_EXCLAMATION    = 'yes'
@@ -94,6 +101,47 @@ ICON_BOOKMARK       = 'bookmark'
 ICON_PRIO1          = 'full-1'
 ICON_PRIO2          = 'full-2'
 
+# FILE FORMAT
+RE_MAP_VERSION      = re.compile(rb'freeplane\s+([^"]+)"')
+
+# NODE CONTENT
+RE_CORELINK         = re.compile(r'.*ID_(\d+)\.text')
+
+# LEGACY FILE FORMAT (prior to v1.8.0)
+LEGACY_CHARACTER_TRANSLATION = str.maketrans({
+    chr(160):   ' ',
+    'ä':        '&#xe4;',   # &#228
+    'ö':        '&#xf6;',   # &#246
+    'ü':        '&#xfc;',   # &#252
+    'Ä':        '&#xc4;',
+    'Ö':        '&#xd6;',
+    'Ü':        '&#xdc;',
+    'ß':        '&#xdf;',
+    })
+
+# HTML CONVERSION
+RE_WHITESPACE       = re.compile(r'\s+')
+RE_LT_GT_ENTITY     = re.compile(r'&(lt|gt);')
+LT_GT_ENTITIES      = {'lt': '<', 'gt': '>'}
+SIMPLE_HTML_TAGS    = frozenset(('richcontent', 'html', 'head', 'body', 'p', 'br'))
+
+# text portions which html2text would escape or treat specially. these are
+# backslashes, characters serialized as entities, non-breaking spaces and the
+# line starts looking like list items or rulers (see html2text's
+# escape_md_section). html2text applies the line start checks to each text
+# portion separately, so they are done here the same way.
+RE_HTML2TEXT_SPECIALS = re.compile(
+        r'[\\&<>\xa0]|^\s*(?:\d+\.(?=\s)|\+(?=\s)|-(?=\s|-))',
+        re.MULTILINE,
+        )
+
+# lines which html2text might take for lists, tables or links. these are not
+# re-wrapped by html2text but kept as they are, including trailing spaces.
+RE_HTML2TEXT_NOWRAP = re.compile(r'^[-*+]|^\d+\.(?:\s|$)|[\[|]')
+
+# html2text's default line width. longer lines are wrapped by html2text.
+HTML2TEXT_BODY_WIDTH = 78
+
 
 # logging
 logging.basicConfig(
@@ -102,6 +150,53 @@ logging.basicConfig(
         )
 
 
+# STANDARD MAP
+
+# the XML structure of a newly created mindmap. it contains some standard
+# settings identified within the normal freeplane files. the map's version and
+# the root node's ID are set when creating the mindmap.
+DEFAULT_MAP_XML = """
+<map>
+  <attribute_registry SHOW_ATTRIBUTES="hide"/>
+  <node TEXT="new_mindmap" FOLDED="false">
+    <edge STYLE="horizontal" COLOR="#cccccc"/>
+    <hook NAME="MapStyle" zoom="1.00">
+      <properties show_icon_for_attributes="false" show_note_icons="false"/>
+      <map_styles>
+        <stylenode LOCALIZED_TEXT="styles.root_node">
+          <stylenode LOCALIZED_TEXT="styles.predefined" POSITION="right">
+            <stylenode LOCALIZED_TEXT="default" MAX_WIDTH="600" COLOR="#000000" STYLE="as_parent">
+              <font NAME="Segoe UI" SIZE="12" BOLD="false" ITALIC="false"/>
+            </stylenode>
+            <stylenode LOCALIZED_TEXT="defaultstyle.details"/>
+            <stylenode LOCALIZED_TEXT="defaultstyle.note"/>
+            <stylenode LOCALIZED_TEXT="defaultstyle.floating">
+              <edge STYLE="hide edge"/>
+              <cloud COLOR="#0f0f0f" SHAPE="ROUND_RECT"/>
+            </stylenode>
+          </stylenode>
+          <stylenode LOCALIZED_TEXT="styles.user-defined" POSITION="right">
+            <stylenode LOCALIZED_TEXT="styles.topic" COLOR="#18898b" STYLE="fork">
+              <font NAME="Liberation Sans" SIZE="12" BOLD="true"/>
+            </stylenode>
+            <stylenode LOCALIZED_TEXT="styles.subtopic" COLOR="#cc3300" STYLE="fork">
+              <font NAME="Liberation Sans" SIZE="12" BOLD="true"/>
+            </stylenode>
+            <stylenode LOCALIZED_TEXT="styles.subsubtopic" COLOR="#669900">
+              <font NAME="Liberation Sans" SIZE="12" BOLD="true"/>
+            </stylenode>
+            <stylenode LOCALIZED_TEXT="styles.important">
+              <icon BUILTIN="yes"/>
+            </stylenode>
+          </stylenode>
+        </stylenode>
+      </map_styles>
+    </hook>
+  </node>
+</map>
+"""
+
+
 # MINDMAP
 
 class Mindmap(object):
@@ -122,6 +217,7 @@ class Mindmap(object):
     # added another digit (initially 10 digits).
     _global_node_id_incr = 0
     _global_node_id_seed = datetime.datetime.now().strftime('%y%m%d')
+    _global_node_id_prefix = 'ID_' + _global_node_id_seed
 
 
     def __init__(
@@ -132,6 +228,7 @@ class Mindmap(object):
             id='',
             log_level="warning",
             logger=None,
+            strip_whitespace=False,
             ):
 
 
@@ -202,14 +299,14 @@ class Mindmap(object):
             args = parser.parse_args(sys.argv[1:2])
 
             # check if command is provided in script
-            if not hasattr(self, args.command):
+            if args.command not in CLI_COMMANDS:
 
                 self._logger.error('Unrecognized command. EXITING.')
                 parser.print_help()
                 sys.exit(1)
 
-            # use dispatch pattern to invoke method with same name
-            getattr(self, args.command)()
+            # use dispatch pattern to invoke function with same name
+            CLI_COMMANDS[args.command]()
 
 
 
@@ -233,6 +330,21 @@ class Mindmap(object):
         # type, version
         self._type = mtype
 
+        # lookup indexes used by getText(), mapping type attribute values to
+        # their hosting nodes and parent nodes to {text: node} dicts
+        self._root_attr_cache = {}
+        self._text_cache = {}
+
+        # lower-cased names of user-defined styles, determined on first use
+        self._style_names = None
+
+        # Node objects currently in use for the map's elements
+        self._node_wrappers = weakref.WeakValueDictionary()
+
+        # index mapping lower-cased node ids to the map's node elements,
+        # created on first use
+        self._id_index = None
+
 
 
 
@@ -259,100 +371,86 @@ class Mindmap(object):
             # encoding of older freeplane files was not stable. so, detecting
             # the encoding before load prevents some encoding errors.
 
-            # open mindmap file and read first row
-            retry = False
-            try:
-                with io.open(self._path, "r", encoding="utf-8") as fpMap:
-                    strFirstLine = fpMap.readline()
-            except:
-                self._logger.info("format mismatch in mindmap file vs. UTF-8. TRYING WORKAROUND.")
-                retry = True
-
-            # in case there are wrong encodings when trying to read as UTF-8,
-            # it is tried to use Window's native encoding scheme to read the
-            # file. this will be most likely the case and might be a good
-            # workaround
-
-            if retry:
-                try:
-                    with io.open(self._path, "r", encoding="windows-1252") as fpMap:
-                        strFirstLine = fpMap.readline()
-                    self._logger.info("format mismatch could be worked around, successfully")
-                except:
-                    self._logger.warning("format mismatch in mindmap file vs. windows-1252. FURTHER PROBLEMS WILL FOLLOW.")
-
-            # now, analyze the characters in the first line of the mindmap file
-            # and try to find the "freeplane" token which will contain the
-            # version information.
-
-            # detect from '<map version="freeplane 1.3.0">'
-            idxFpToken    = strFirstLine.find("freeplane")
-            idxSpace      = strFirstLine[idxFpToken:].find(" ") + idxFpToken
-            idxVer        = idxSpace+1
-            idxClQuote    = strFirstLine[idxVer:].find('"') + idxVer
-            self._version = strFirstLine[idxVer:idxClQuote]
+            # the version information is located within the map element at
+            # the very beginning of the file, e.g. '<map version="freeplane
+            # 1.3.0">'. so, only the first bytes of the file are read and
+            # searched. as the token itself consists of ASCII characters, no
+            # decoding of the file's content is necessary for this.
 
+            # the file is opened only once. its handle is used for the version
+            # detection and the parse itself.
+            with io.open(self._path, "rb") as fpMap:
 
+                # read first bytes of mindmap file
+                _match = RE_MAP_VERSION.search(fpMap.read(256))
 
+                if _match:
+                    self._version = _match.group(1).decode('ascii', 'replace')
+                else:
+                    self._logger.warning("no freeplane version found in mindmap file. FURTHER PROBLEMS WILL FOLLOW.")
+                    self._version = ''
 
-            #
-            # set parser encoding due to map version
-            #
-
-            # now use the freeplane file version to determine the encoding.
 
-            # check for fitting encoding
-            encoding = get_version_specific_file_encoding(self._version)
 
-            # set encoding to be read
-            xmlparser = ET.XMLParser(encoding=encoding)
-            # xmlparser = ET.XMLParser(encoding="latin1")
-            # xmlparser = ET.XMLParser(encoding="utf-8")
 
+                #
+                # set parser encoding due to map version
+                #
 
+                # now use the freeplane file version to determine the encoding.
 
+                # check for fitting encoding. it is kept for later save operations.
+                self._encoding = get_version_specific_file_encoding(self._version)
 
-            #
-            # read entire mindmap and evaluate structure
-            #
+                # set encoding to be read. as node IDs are managed by this
+                # module, libxml2 doesn't need to collect them within its own
+                # hash table. also, very large or deep mindmaps are allowed.
+                # mindmaps neither use a DTD nor external entities. so, none
+                # of them is loaded or resolved and no network access
+                # happens. whitespace-only text between elements is kept by
+                # default, as it might be part of the nodes' rich text
+                # content. if stripped on user request, the tree gets smaller.
+                xmlparser = ET.XMLParser(
+                        encoding=self._encoding,
+                        huge_tree=True,
+                        collect_ids=False,
+                        remove_blank_text=strip_whitespace,
+                        load_dtd=False,
+                        resolve_entities=False,
+                        no_network=True,
+                        )
+                # xmlparser = ET.XMLParser(encoding="latin1")
+                # xmlparser = ET.XMLParser(encoding="utf-8")
 
-            # some Freeplane versions produce invalid XML syntax when writing
-            # the mindmap into file. here, these invalid syntaxes are to be
-            # removed from the file, before using and parsing the file.
 
-            try:
-                self._mindmap = ET.parse(self._path, parser=xmlparser)
 
-            except ET.XMLSyntaxError:
-                self._logger.warning("invalid XML syntax. will try to fix it temporarily...")
 
-                # write sanitized file into temporary file
-                _basename = "_" + os.path.basename(self._path)
-                _dirname  = os.path.dirname(self._path)
+                #
+                # read entire mindmap and evaluate structure
+                #
 
-                # ensure temp file is not yet present
-                while os.path.isfile(os.path.join(_dirname, _basename)):
-                    _basename = "_" + _basename
-                _temp_file = os.path.join(_dirname, _basename)
+                # some Freeplane versions produce invalid XML syntax when
+                # writing the mindmap into file. in case the file can't be
+                # parsed, these invalid syntaxes are removed from the file's
+                # content in memory, before parsing it again.
 
-                # read original XML file
-                with io.open(self._path, "r", encoding="utf-8") as _file:
-                    _content = _file.read()
+                # rewind file for the actual parse
+                fpMap.seek(0)
 
-                # sanitize content
-                _content = _content.replace("&nbsp;", "&#160;")
+                try:
+                    self._mindmap = ET.parse(fpMap, parser=xmlparser)
 
-                # create and write temp file
-                with io.open(_temp_file, "w", encoding="utf-8") as _file:
-                    _file.write(_content)
+                except ET.XMLSyntaxError:
+                    self._logger.warning("invalid XML syntax. will try to fix it temporarily...")
 
-                # repeat open of mindmap
-                self._mindmap = ET.parse(_temp_file, parser=xmlparser)
+                    # read original XML file and sanitize content
+                    fpMap.seek(0)
+                    _content = fpMap.read().replace(b"&nbsp;", b"&#160;")
 
-                # remove temporary file
-                os.remove(_temp_file)
+                    # parse sanitized content from memory
+                    self._mindmap = ET.parse(io.BytesIO(_content), parser=xmlparser)
 
-                self._logger.info("... XML source was successfully sanitized.")
+                    self._logger.info("... XML source was successfully sanitized.")
 
             # now that the XML file has been read in in a valid way, the normal
             # XML parsing is to take place within the module's functionalities.
@@ -363,9 +461,6 @@ class Mindmap(object):
             # find and get first node element of etree
             self._rootnode = self._root.find('node')
 
-            # build parent map (using ElementTree nodes)
-            self._parentmap = {c:p for p in self._rootnode.iter() for c in p}
-
 
 
 
@@ -386,159 +481,26 @@ class Mindmap(object):
         # set version
         self._version = version
 
-        # init parentmap dictionary in order to facilitate quick identification
-        # of parent nodes of valid node objects (using ElementTree nodes as
-        # keys and values)
-        self._parentmap = {}
+        # set encoding due to map version
+        self._encoding = get_version_specific_file_encoding(self._version)
+
+        # create map element from the standard map structure. libxml2 builds
+        # the whole tree in a single parse instead of creating and appending
+        # each element separately.
+        self._mindmap = ET.fromstring(
+                DEFAULT_MAP_XML,
+                ET.XMLParser(remove_blank_text=True),
+                )
 
-        # create map element as XML node containing the version information
-        self._mindmap = ET.Element('map') 
-        self._mindmap.attrib['version'] = 'freeplane ' + self._version
+        # set version information within map element
+        self._mindmap.set('version', 'freeplane ' + self._version)
 
         # get root of mindmap (necessary for save operation)
         self._root = self._mindmap
 
-        # set some attributes for visibility within freeplane editor
-        _node = ET.Element('attribute_registry') 
-        _node.attrib['SHOW_ATTRIBUTES'] = 'hide'
-        self._mindmap.append(_node)
-
-        # create 1st visible node element containing standard TEXT
-        self._rootnode = ET.Element('node') 
-        self._rootnode.attrib["TEXT"] = "new_mindmap"
-        self._rootnode.attrib["FOLDED"] = "false"
-        self._rootnode.attrib["ID"] = Mindmap.create_node_id()
-        self._mindmap.append(self._rootnode)
-
-        # create some standard edge styles
-        _node = ET.Element('edge') 
-        _node.attrib['STYLE'] = 'horizontal'
-        _node.attrib['COLOR'] = '#cccccc'
-        self._rootnode.append(_node)
-
-        #
-        # hook element and properties
-        #
-
-        _hook = ET.Element('hook') 
-        _hook.attrib["NAME"] = "MapStyle"
-        _hook.attrib["zoom"] = "1.00"
-        self._rootnode.append(_hook)
-        # sub element properties
-        _node = ET.Element('properties')
-        _node.attrib["show_icon_for_attributes"] = "false"
-        _node.attrib["show_note_icons"] = "false"
-        _hook.append(_node)
-
-        #
-        # map styles
-        #
-
-        # sub element map styles
-        _mapstyles = ET.Element('map_styles')
-        _hook.append(_mapstyles)
-        # sub sub element stylenode
-        _stylenode = ET.Element('stylenode')
-        _stylenode.attrib["LOCALIZED_TEXT"] = "styles.root_node"
-        _mapstyles.append(_stylenode)
-
-        #
-        # predefined styles
-        #
-
-        # sub sub sub element stylenode
-        _node = ET.Element('stylenode')
-        _node.attrib["LOCALIZED_TEXT"] = "styles.predefined"
-        _node.attrib["POSITION"] = "right"
-        _stylenode.append(_node)
-        # sub sub sub element stylenode
-        _node2 = ET.Element('stylenode')
-        _node2.attrib["LOCALIZED_TEXT"] = "default"
-        _node2.attrib["MAX_WIDTH"] = "600"
-        _node2.attrib["COLOR"] = "#000000"
-        _node2.attrib["STYLE"] = "as_parent"
-        _node.append(_node2)
-        # sub sub sub sub element stylenode
-        _node3 = ET.Element('font')
-        _node3.attrib["NAME"] = "Segoe UI"
-        _node3.attrib["SIZE"] = "12"
-        _node3.attrib["BOLD"] = "false"
-        _node3.attrib["ITALIC"] = "false"
-        _node2.append(_node3)
-        # sub sub sub element stylenode
-        _node2 = ET.Element('stylenode')
-        _node2.attrib["LOCALIZED_TEXT"] = "defaultstyle.details"
-        _node.append(_node2)
-        # sub sub sub element stylenode
-        _node2 = ET.Element('stylenode')
-        _node2.attrib["LOCALIZED_TEXT"] = "defaultstyle.note"
-        _node.append(_node2)
-        # sub sub sub element stylenode
-        _node2 = ET.Element('stylenode')
-        _node2.attrib["LOCALIZED_TEXT"] = "defaultstyle.floating"
-        _node.append(_node2)
-        # sub sub sub sub element stylenode
-        _node3 = ET.Element('edge')
-        _node3.attrib["STYLE"] = "hide edge"
-        _node2.append(_node3)
-        # sub sub sub sub element stylenode
-        _node3 = ET.Element('cloud')
-        _node3.attrib["COLOR"] = "#0f0f0f"
-        _node3.attrib["SHAPE"] = "ROUND_RECT"
-        _node2.append(_node3)
-
-        #
-        # user styles
-        #
-
-        # sub sub sub element stylenode
-        _node = ET.Element('stylenode')
-        _node.attrib["LOCALIZED_TEXT"] = "styles.user-defined"
-        _node.attrib["POSITION"] = "right"
-        _stylenode.append(_node)
-        # sub sub sub element stylenode
-        _node2 = ET.Element('stylenode')
-        _node2.attrib["LOCALIZED_TEXT"] = "styles.topic"
-        _node2.attrib["COLOR"] = "#18898b"
-        _node2.attrib["STYLE"] = "fork"
-        _node.append(_node2)
-        # sub sub sub sub element stylenode
-        _node3 = ET.Element('font')
-        _node3.attrib["NAME"] = "Liberation Sans"
-        _node3.attrib["SIZE"] = "12"
-        _node3.attrib["BOLD"] = "true"
-        _node2.append(_node3)
-        # sub sub sub element stylenode
-        _node2 = ET.Element('stylenode')
-        _node2.attrib["LOCALIZED_TEXT"] = "styles.subtopic"
-        _node2.attrib["COLOR"] = "#cc3300"
-        _node2.attrib["STYLE"] = "fork"
-        _node.append(_node2)
-        # sub sub sub sub element stylenode
-        _node3 = ET.Element('font')
-        _node3.attrib["NAME"] = "Liberation Sans"
-        _node3.attrib["SIZE"] = "12"
-        _node3.attrib["BOLD"] = "true"
-        _node2.append(_node3)
-        # sub sub sub element stylenode
-        _node2 = ET.Element('stylenode')
-        _node2.attrib["LOCALIZED_TEXT"] = "styles.subsubtopic"
-        _node2.attrib["COLOR"] = "#669900"
-        _node.append(_node2)
-        # sub sub sub sub element stylenode
-        _node3 = ET.Element('font')
-        _node3.attrib["NAME"] = "Liberation Sans"
-        _node3.attrib["SIZE"] = "12"
-        _node3.attrib["BOLD"] = "true"
-        _node2.append(_node3)
-        # sub sub sub element stylenode
-        _node2 = ET.Element('stylenode')
-        _node2.attrib["LOCALIZED_TEXT"] = "styles.important"
-        _node.append(_node2)
-        # sub sub sub sub element stylenode
-        _node3 = ET.Element('icon')
-        _node3.attrib["BUILTIN"] = "yes"
-        _node2.append(_node3)
+        # get 1st visible node element containing standard TEXT
+        self._rootnode = self._mindmap.find('node')
+        self._rootnode.set("ID", Mindmap.create_node_id())
 
 # MAP
 
@@ -571,9 +533,7 @@ class Mindmap(object):
         cls._global_node_id_incr += 1
 
         # set the node id
-        _id = 'ID_' + \
-                cls._global_node_id_seed + \
-                '{:04}'.format(cls._global_node_id_incr)
+        _id = f'{cls._global_node_id_prefix}{cls._global_node_id_incr:04}'
 
 
 
@@ -594,16 +554,13 @@ class Mindmap(object):
             while not bLeave:
 
                 # check for calculated id already used
-                lstOfNodesMatchingId = mindmap._root.xpath("//node[@ID='" + _id + "']")
-                if len(lstOfNodesMatchingId):
+                if mindmap._get_element_by_id(_id) is not None:
 
                     # increment global node id counter
                     cls._global_node_id_incr += 1
 
                     # set the node id string
-                    _id = 'ID_' + \
-                            cls._global_node_id_seed + \
-                            '{:04}'.format(cls._global_node_id_incr)
+                    _id = f'{cls._global_node_id_prefix}{cls._global_node_id_incr:04}'
 
                 else:
                     bLeave = True
@@ -676,40 +633,60 @@ class Mindmap(object):
 
     @property
     def rootnode(self):
-        return Node(self._rootnode, self)
+        return self._get_node(self._rootnode)
+
+
+    def _get_node(self, element):
+        """
+        return a Node object for an element attached to the map. Node objects
+        which are still referenced elsewhere are re-used instead of creating
+        a new one for every request. as the user might have changed a node's
+        map or branch reference, a Node object is only re-used as long as it
+        still refers to this map.
+        """
+
+        node = self._node_wrappers.get(element)
+        if node is None \
+                or node._map is not self \
+                or node._branch is not None:
+            node = Node(element, self)
+            self._node_wrappers[element] = node
+        return node
 
 
     @property
     def styles(self):
         _style = {}
 
-        _stylenode_user = self._mindmap.find('.//stylenode[@LOCALIZED_TEXT="styles.user-defined"]')
-        _lst = _stylenode_user.findall('./stylenode[@TEXT]')
-        for _sty in _lst:
+        _stylenode_user = self._get_user_styles_element()
+        if _stylenode_user is None:
+            return _style
+
+        for _sty in XPATH_STYLES(_stylenode_user):
             _item = {}
+            _attrib = _sty.attrib
 
             # style name
-            _name = _sty.get('TEXT', '')
+            _name = _attrib.get('TEXT', '')
 
             # foreground color
-            _color = _sty.get('COLOR', '')
+            _color = _attrib.get('COLOR', '')
             if _color:
                 _item['color'] = _color
 
             # background color
-            _bgcolor = _sty.get('BACKGROUND_COLOR', '')
+            _bgcolor = _attrib.get('BACKGROUND_COLOR', '')
             if _bgcolor:
                 _item['bgcolor'] = _bgcolor
 
             # font
-            _sty_sub = _sty.find('./font')
+            _sty_sub = _sty.find('font')
             if _sty_sub is not None:
+                _font_attrib = _sty_sub.attrib
                 # font name
-                _fontname = _sty_sub.get('NAME', '')
-                _item['fontname'] = _fontname
+                _item['fontname'] = _font_attrib.get('NAME', '')
                 # font size
-                _fontsize = _sty_sub.get('SIZE', '')
-                _item['fontsize'] = _fontsize
+                _item['fontsize'] = _font_attrib.get('SIZE', '')
 
             # ...
 
@@ -719,6 +696,50 @@ class Mindmap(object):
         return _style
 
 
+    def _get_user_styles_element(self):
+        """
+        return the element holding the user-defined styles.
+        """
+
+        # unlike an XPath expression which collects all matches within the
+        # whole map, find() stops at the first match. as the styles are
+        # located at the very beginning of the map, nearly none of the map's
+        # nodes are visited.
+        return self._root.find('.//stylenode[@LOCALIZED_TEXT="styles.user-defined"]')
+
+
+    def _get_style_names(self):
+        """
+        return the set of lower-cased names of all user-defined styles. the
+        set is determined once and kept up to date by add_style().
+        """
+
+        # the names are selected as attribute values within a single XPath
+        # evaluation, so that neither the style elements themselves nor their
+        # font settings need to be accessed.
+
+        if self._style_names is None:
+            _stylenode_user = self._get_user_styles_element()
+            self._style_names = set()
+            if _stylenode_user is not None:
+                self._style_names.update(
+                        _name.lower()
+                        for _name in XPATH_STYLE_NAMES(_stylenode_user)
+                        )
+        return self._style_names
+
+
+    def _contains(self, element):
+        """
+        check if an element is part of the map's XML tree.
+        """
+
+        # lxml keeps removed elements associated with their former document.
+        # so, the element's ancestors are checked instead of its document.
+        return element is self._root \
+                or any(_ancestor is self._root for _ancestor in element.iterancestors())
+
+
     def add_style(self,
                 name='',
                 settings={},
@@ -743,22 +764,16 @@ class Mindmap(object):
             #
 
             # look for parent element
-            _stylenode_user = self._mindmap.find('.//stylenode[@LOCALIZED_TEXT="styles.user-defined"]')
-
-            # get list of existing style elements
-            _lst = _stylenode_user.findall('./stylenode[@TEXT]')
+            _stylenode_user = self._get_user_styles_element()
 
             # leave function if style is already existing
-            for _sty in _lst:
-                if name.lower() == _sty.get('TEXT').lower():
-                    print('[ WARNING: style "' + name + '" is already existing. ignoring request. ]')
-                    return False
-
-            # create element
-            _sty = ET.Element("stylenode", TEXT=name)
+            if name.lower() in self._get_style_names():
+                print('[ WARNING: style "' + name + '" is already existing. ignoring request. ]')
+                return False
 
-            # append element to list of styles
-            _stylenode_user.append(_sty)
+            # create element within list of styles
+            _sty = ET.SubElement(_stylenode_user, "stylenode", TEXT=name)
+            self._style_names.add(name.lower())
 
 
 
@@ -769,29 +784,27 @@ class Mindmap(object):
 
             # foreground color
             _check = 'color'
-            if _check in settings.keys():
+            if _check in settings:
                 _sty.set('COLOR', settings[_check])
 
             # background color
             _check = 'bgcolor' 
-            if _check in settings.keys():
+            if _check in settings:
                 _sty.set('BACKGROUND_COLOR', settings[_check])
 
             # font name
             _check = 'fontname'
-            if _check in settings.keys():
-                _item = ET.Element('font', NAME=settings[_check])
+            if _check in settings:
                 # add item to style
-                _sty.append(_item)
+                _item = ET.SubElement(_sty, 'font', NAME=settings[_check])
 
             # font size
             _check = 'fontsize'
-            if _check in settings.keys():
+            if _check in settings:
                 _item = _sty.find('./font')
                 if _item is None:
                     # create new font element
-                    _item = ET.Element('font', SIZE=settings[_check])
-                    _sty.append(_item)
+                    _item = ET.SubElement(_sty, 'font', SIZE=settings[_check])
                 else:
                     # add size attribute to font element
                     _item.set("SIZE", settings[_check])
@@ -801,6 +814,87 @@ class Mindmap(object):
         return False
 
 
+    def _get_id_index(self):
+        """
+        return the index mapping the lower-cased ids of the map's nodes to
+        their elements. it is created within a single pass over the map on
+        first use and extended whenever a node id is created or set by this
+        module. entries of removed nodes or changed ids are not removed. so,
+        an element found within the index has to be checked before use.
+        """
+
+        if self._id_index is None:
+            self._id_index = {}
+            for _node in self._root.iter('node'):
+                _id = _node.get('ID')
+                if _id:
+                    self._id_index.setdefault(_id.lower(), _node)
+        return self._id_index
+
+
+    def _register_id(self, element):
+        """
+        add a node element to the map's id index, if the index is in use.
+        """
+
+        if self._id_index is not None:
+            _id = element.get('ID')
+            if _id:
+                self._id_index[_id.lower()] = element
+
+
+    def _get_element_by_id(self, id):
+        """
+        return the node element of the map carrying the given id (ignoring
+        the case) or None.
+        """
+
+        _id = id.lower()
+        _node = self._get_id_index().get(_id)
+        if _node is None:
+            return None
+
+        # an outdated entry leads to the index being created again
+        if _node.get('ID', '').lower() != _id or not self._contains(_node):
+            self._id_index = None
+            _node = self._get_id_index().get(_id)
+        return _node
+
+
+    def _iter_xml_nodes(self, xmlnode=None, axis='descendant', id='', **kwargs):
+        """
+        same as iter_xml_nodes, but using the map's id index in case an id is
+        given.
+        """
+
+        if not id:
+            return iter_xml_nodes(xmlnode=xmlnode, axis=axis, **kwargs)
+
+        # as node ids are unique, at most the indexed node can match. it is
+        # checked to be located on the requested axis and to match the
+        # remaining arguments.
+        _node = self._get_element_by_id(id)
+        if _node is None:
+            return iter(())
+        if axis == 'child':
+            bOnAxis = _node.getparent() is xmlnode
+        else:
+            bOnAxis = (axis == 'descendant-or-self' and _node is xmlnode) \
+                    or any(_ancestor is xmlnode for _ancestor in _node.iterancestors())
+        if not bOnAxis:
+            return iter(())
+        return filter_xml_nodes([_node], **kwargs)
+
+
+    def _find_xml_nodes(self, **kwargs):
+        """
+        same as find_xml_nodes, but using the map's id index in case an id is
+        given.
+        """
+
+        return list(self._iter_xml_nodes(**kwargs))
+
+
     def find_nodes(
             self,
             core='',
@@ -815,22 +909,62 @@ class Mindmap(object):
             keep_link_specials=False,
             ):
 
+        # collect all matching nodes. the Node instances are created on
+        # access.
+        return NodeView(
+            self._find_xml_nodes(
+                xmlnode=self._root,
+                axis='descendant',
+                id=id,
+                core=core,
+                attrib=attrib,
+                details=details,
+                notes=notes,
+                link=link,
+                icon=icon,
+                exact=exact,
+                caseinsensitive=caseinsensitive,
+                keep_link_specials=False,
+            ),
+            self._get_node,
+        )
+
+
+    def iter_nodes(
+            self,
+            core='',
+            link='',
+            id='',
+            attrib='',
+            details='',
+            notes='',
+            icon='',
+            exact=False,
+            caseinsensitive=False,
+            keep_link_specials=False,
+            ):
+        """
+        iterate over the nodes in the map matching all given arguments. in
+        contrast to find_nodes, the nodes are searched only as far as they
+        are requested by the caller.
+        """
+
 
 
 
         #
-        # find list of nodes in map
+        # find nodes in map
         #
 
         # start with ALL nodes within the mindmap and strip down to the number
         # of nodes matching all given arguments
 
-        # list all nodes regardless of further properties
-        lstXmlNodes = self._root.findall(".//node")
-
-        # do the checks on the base of the list
-        lstXmlNodes = reduce_node_list(
-            lstXmlNodes=lstXmlNodes,
+        # select all nodes below the map element which match the given
+        # arguments. as far as possible, the checks are done by the XPath
+        # engine while selecting the nodes.
+        for _node in self._iter_xml_nodes(
+            xmlnode=self._root,
+            axis='descendant',
             id=id,
             core=core,
             attrib=attrib,
@@ -841,220 +975,207 @@ class Mindmap(object):
             exact=exact,
             caseinsensitive=caseinsensitive,
             keep_link_specials=False,
-        )
+        ):
 
+            # get Node instance
+            yield self._get_node(_node)
 
 
+    def find_nodes_multi(self, queries=()):
+        """
+        find the nodes of several searches within the map. each search is
+        given as a dict holding the arguments known from find_nodes. the
+        map's nodes are collected only once for all of the searches.
 
+        :returns: list holding the found nodes for each of the searches
+        """
 
-        #
-        # create Node instances
-        #
+        lstNodes = None
+        lstResults = []
+        for query in queries:
 
-        lstNodesRet = []
-        for _node in lstXmlNodes:
+            # checks for a node's attributes and icons are done most
+            # efficiently by XPath while walking the map
+            if query.get('attrib') or query.get('icon'):
+                lstXmlNodes = find_xml_nodes(xmlnode=self._root, **query)
 
-            # create reference to parent lxml node
-            #...
+            # all other checks are done on the list of the map's nodes, which
+            # is created once for all searches
+            else:
+                if lstNodes is None:
+                    lstNodes = list(self._root.iterdescendants('node'))
+                lstXmlNodes = reduce_node_list(lstNodes, **query)
 
-            # apend to list
-            lstNodesRet.append(Node(_node, self))
+            lstResults.append(NodeView(lstXmlNodes, self._get_node))
 
-        return lstNodesRet
+        return lstResults
 
 
-    def save(self, strPath, encoding=''):
+    def find_nodes_bulk(self, cores=()):
+        """
+        find the nodes containing one of the given strings within their core
+        text, ignoring the case. the map is walked only once for all of the
+        search strings.
+
+        :returns: dict mapping each search string to its list of Node objects
+        """
+
+        dicResult = {core: [] for core in cores}
 
 
 
 
         #
-        # auto-determine and set encoding
+        # prepare search
         #
 
-        # check for fitting encoding
-        if not encoding:
-            encoding = get_version_specific_file_encoding(self._version)
+        # search strings only differing in their case share the same search.
+        # empty search strings match every node.
+        dicQueries = {}
+        lstEmpty = []
+        for core in dicResult:
+            if core:
+                dicQueries.setdefault(core.lower(), []).append(core)
+            else:
+                lstEmpty.append(core)
 
+        # if the optional pyahocorasick package is available, all search
+        # strings are looked for within a single scan of each core text.
+        # otherwise, each search string is checked separately.
+        try:
+            import ahocorasick
+        except ImportError:
+            ahocorasick = None
 
+        if ahocorasick is not None and dicQueries:
+            automaton = ahocorasick.Automaton()
+            for _word in dicQueries:
+                automaton.add_word(_word, _word)
+            automaton.make_automaton()
 
+            def matching_words(text):
+                return {_word for _end, _word in automaton.iter(text)}
 
-        #
-        # create XML formatted output string
-        #
+        else:
 
-        # create output string
-        _outputstring = ET.tostring(
-            self._root,
-            pretty_print=True,
-            method='xml',
-            encoding=encoding,
-            ).decode(encoding)
+            def matching_words(text):
+                return [_word for _word in dicQueries if _word in text]
 
 
 
 
         #
-        # sanitize string content
+        # find nodes in map
         #
 
-        # prior to v1.8.0 the mindmap file was not a real XML and also not
-        # consequently encoded in a specific code format. rather the encoding
-        # is a mixture between "latin1" and "windows-1252". thus, in Germany,
-        # at least the german special characters must be corrected to be
-        # properly displayed within freeplane.
-
-        _version = self._version.split('.')
-        if int(_version[0]) == 1 and int(_version[1]) < 8:
-
-            # #160 characters representing <SPACE>
-            _outputstring = _outputstring.replace( chr(160),' ')
-
-            # at least substitute encoded german special characters
-            # with characters fitting to the UTF-8 HTML encoding
+        for _node in self._root.iterdescendants('node'):
+            _words = matching_words(_node.get('TEXT', '').lower())
+            if _words or lstEmpty:
+                fpnode = self._get_node(_node)
+                for _word in _words:
+                    for core in dicQueries[_word]:
+                        dicResult[core].append(fpnode)
+                for core in lstEmpty:
+                    dicResult[core].append(fpnode)
 
-            _outputstring = _outputstring.replace( 'ä','&#xe4;') # &#228
-            _outputstring = _outputstring.replace( 'ö','&#xf6;') # &#246
-            _outputstring = _outputstring.replace( 'ü','&#xfc;') # &#252
-            _outputstring = _outputstring.replace( 'Ä','&#xc4;')
-            _outputstring = _outputstring.replace( 'Ö','&#xd6;')
-            _outputstring = _outputstring.replace( 'Ü','&#xdc;')
-            _outputstring = _outputstring.replace( 'ß','&#xdf;')
+        return dicResult
 
-            # by copy/paste from other applications into the mindmap, there
-            # might be further character sequences not wanted within this file
 
-            # alternative double quotes
-            # _outputstring = _outputstring.replace( '&#x201c;','&quot;')
-            # _outputstring = _outputstring.replace( '&#x201e;','&quot;')
-
-            # three subsequent dots (e.g. from EXCEL's auto chars)
-            # _outputstring = _outputstring.replace( '&#x2026;','...')
-            # _outputstring = _outputstring.replace( chr(0x2026);','...')
-            # _outputstring = _outputstring.replace( chr(133),'...')
+    def save(self, strPath, encoding=''):
 
 
 
 
         #
-        # write content into file
+        # auto-determine and set encoding
         #
 
-        # remove first line if not starting with "<map"
-        # as Freeplane doesn't use strict XML
-        if not _outputstring.startswith("<map"):
-            _outputstring = _outputstring.split('\n', 1)[1]
-
-        # open output file
-        _file = io.open(strPath, "w", encoding=encoding)
-
-        # write output string
-        _file.write( _outputstring )
+        # use the encoding determined on map creation if not given otherwise
+        encoding = encoding or self._encoding
 
-        # close file
-        _file.close()
 
 
-    def test(self):
 
-        # strExamplePath = "example__code2mm__v1_8_11.mm"
-        # strExamplePath = "example__code2mm__v1_3_15.mm"
-        # mm = Mindmap(strExamplePath)
-        # dicStyles = mm.Styles
-        # print(dicStyles)
-        # mm.save(strExamplePath[:strExamplePath.rfind('.')] + '__saved.mm')
-
-
-
-
-        # create new mindmap
-        mm=Mindmap()
+        #
+        # write maps of current versions directly
+        #
 
-        # get and print root node
-        rn=mm.rootnode
-        print(rn)
+        # as Freeplane doesn't use strict XML, no XML declaration is written.
+        # starting with v1.8.0, no character substitutions are necessary. so,
+        # the XML tree is serialized straight into the file without creating
+        # an intermediate copy of the whole document.
 
-        # change root node plain text
-        rn.plaintext = "ROOT NODE"
-        print(rn)
+        _version = self._version.split('.')
+        if not (int(_version[0]) == 1 and int(_version[1]) < 8):
+            ET.ElementTree(self._root).write(
+                strPath,
+                pretty_print=True,
+                method='xml',
+                encoding=encoding,
+                xml_declaration=False,
+                )
+            return
 
 
 
 
         #
-        # create some nodes and branches
+        # create XML formatted output
         #
 
-        # create detached node
-        detach=mm.create_node("DETACHED")
-        print(detach)
-
-        # create detached node
-        detach2=mm.create_node("DETACHED2")
-        print(detach2)
-
-        # add node into 2nd detached branch
-        nd2=detach2.add_child("ADDED_TO_DETACHED2_AS_CHILD")
-        print(nd2)
+        # create encoded output to be sanitized before writing it
+        _output = ET.tostring(
+            self._root,
+            pretty_print=True,
+            method='xml',
+            encoding=encoding,
+            xml_declaration=False,
+            )
 
-        # create detached node
-        detach3=mm.create_node("DETACHED3")
-        print(detach3)
 
-        # add node into 2nd detached branch
-        nd3=detach3.add_child("ADDED_TO_DETACHED3_AS_CHILD")
-        print(nd3)
 
-        # check parent node within branch
-        print(nd2.parent)
 
         #
-        # create and attach some styles
+        # sanitize string content
         #
 
-        # add style to mindmap
-        mm.add_style(
-                "klein und grau",
-                {
-                    'color': '#999999',
-                })
-
-        # WARNING: apply non-existing style to detached branch node
-        nd2.style = "groß und grau"
+        # prior to v1.8.0 the mindmap file was not a real XML and also not
+        # consequently encoded in a specific code format. rather the encoding
+        # is a mixture between "latin1" and "windows-1252". thus, in Germany,
+        # at least the german special characters must be corrected to be
+        # properly displayed within freeplane.
 
-        #
-        # attach some nodes and styles
-        #
+        # #160 characters representing <SPACE> and at least the encoded
+        # german special characters are substituted by characters fitting
+        # to the UTF-8 HTML encoding. this is done within a single pass.
 
-        # attach detached3 branch head to detached node nd2
-        nd2.attach(detach3)
+        _outputstring = _output.decode(encoding)
+        _outputstring = _outputstring.translate(LEGACY_CHARACTER_TRANSLATION)
 
-        # WARNING: attach detached branch node to root node
-        rn.attach(nd2)
+        # by copy/paste from other applications into the mindmap, there
+        # might be further character sequences not wanted within this file
 
-        # attach single detached head to root node
-        rn.attach(detach)
+        # alternative double quotes
+        # _outputstring = _outputstring.replace( '&#x201c;','&quot;')
+        # _outputstring = _outputstring.replace( '&#x201e;','&quot;')
 
-        # WARNING: apply existing style to detached branch node
-        detach2.style = "klein und grau"
+        # three subsequent dots (e.g. from EXCEL's auto chars)
+        # _outputstring = _outputstring.replace( '&#x2026;','...')
+        # _outputstring = _outputstring.replace( chr(0x2026);','...')
+        # _outputstring = _outputstring.replace( chr(133),'...')
 
-        # attach detached branch head to root node
-        rn.attach(detach2)
+        _output = _outputstring.encode(encoding)
 
-        # apply existing style to map node
-        nd2.style = "klein und grau"
 
-        # WARNING: attach already attached branch head
-        rn.attach(detach)
 
-        # WARNING: attach already attached branch head to already attached former branch node
-        nd2.attach(detach)
 
         #
-        # save mindmap into file
+        # write content into file
         #
 
-        mm.save("example101.mm")
+        # write output
+        with io.open(strPath, "wb") as _file:
+            _file.write(_output)
 
 
 
@@ -1063,6 +1184,9 @@ class Mindmap(object):
 
 class Branch(object):
 
+    # fixed set of instance members
+    __slots__ = ('_parentmap', '_map')
+
     def __init__(self):
 
         #
@@ -1073,6 +1197,18 @@ class Branch(object):
         self._map = None
 
 
+    def _merge(self, branch):
+        """
+        take over the parent relations of another branch. afterwards, the
+        other branch shares this branch's parentmap, so that Node objects
+        still referring to the other branch remain valid and the other
+        branch's own dict can be released.
+        """
+
+        self._parentmap.update(branch._parentmap)
+        branch._parentmap = self._parentmap
+
+
 
 
 # ARROW STYLES
@@ -1104,6 +1240,41 @@ class ArrowStyles(object):
         return True
 
 
+# NODE VIEW
+
+# searches and child lists can easily return thousands of nodes, of which the
+# caller might only use a few. so, instead of creating a Node object for each
+# of the found XML elements in advance, only the elements are kept and the
+# respective Node object is created when an item is accessed.
+
+class NodeView(collections.abc.Sequence):
+
+    __slots__ = ('_elements', '_wrap')
+
+    def __init__(self, elements, wrap):
+        self._elements = elements
+        self._wrap = wrap
+
+    def __len__(self):
+        return len(self._elements)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self._wrap(_element) for _element in self._elements[idx]]
+        return self._wrap(self._elements[idx])
+
+    def __iter__(self):
+        return map(self._wrap, self._elements)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, NodeView)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+
 # NODE
 
 class Node(object):
@@ -1112,6 +1283,11 @@ class Node(object):
     node-related features can be accessed from here.
     """
 
+    # fixed set of instance members. as there might be lots of node objects,
+    # no per-instance dict is created. weak references are needed for the
+    # map's cache of node objects.
+    __slots__ = ('_map', '_node', '_branch', '__weakref__')
+
     def __init__(self, node, mindmap):
 
 
@@ -1136,6 +1312,8 @@ class Node(object):
             self._node.set('ID',
                 Mindmap.create_node_id(self._map)
                 )
+            if self._map is not None:
+                self._map._register_id(self._node)
 
 
 
@@ -1158,6 +1336,41 @@ class Node(object):
         return self.plaintext
 
 
+    def _wrap(self, element):
+        """
+        return a Node object for an element within the same map or detached
+        branch as this node.
+        """
+
+        # within a map, Node objects still in use are re-used
+        if self._map is not None:
+            return self._map._get_node(element)
+
+        # nodes of a detached branch refer to the same branch object
+        fpnode = Node(element, self._map)
+        fpnode._branch  = self._branch
+
+        return fpnode
+
+
+    def _iter_xml_nodes(self, **kwargs):
+        """
+        select node elements using the map's id index, if available.
+        """
+
+        if self._map is not None:
+            return self._map._iter_xml_nodes(**kwargs)
+        return iter_xml_nodes(**kwargs)
+
+
+    def _find_xml_nodes(self, **kwargs):
+        """
+        select node elements using the map's id index, if available.
+        """
+
+        return list(self._iter_xml_nodes(**kwargs))
+
+
     @property
     def is_detached_head(self):
         """
@@ -1166,7 +1379,7 @@ class Node(object):
         # is not associated with a map
         # and has no parent within the branch
         if self._map is None \
-                and not self._node in self._branch._parentmap.keys():
+                and not self._node in self._branch._parentmap:
             return True
         return False
 
@@ -1178,7 +1391,7 @@ class Node(object):
         # is not associated with a map
         # and has a parent within the branch
         if self._map is None \
-                and self._node in self._branch._parentmap.keys():
+                and self._node in self._branch._parentmap:
             return True
         return False
 
@@ -1189,7 +1402,7 @@ class Node(object):
         """
         # is associated with a map
         if self._map is not None \
-                and not self._node == self._map._rootnode:
+                and self._node is not self._map._rootnode:
             return True
         return False
 
@@ -1200,7 +1413,7 @@ class Node(object):
         """
         # is associated with a map
         if self._map is not None \
-                and self._node == self._map._rootnode:
+                and self._node is self._map._rootnode:
             return True
         return False
 
@@ -1245,7 +1458,7 @@ class Node(object):
 
     @property
     def has_internal_hyperlink(self):
-        _link = self._node.attrib.get("LINK","")
+        _link = self._node.get("LINK","")
         if _link and _link[0] == "#":
             return True
         return False
@@ -1258,19 +1471,14 @@ class Node(object):
         if self.has_internal_hyperlink:
 
             # get target node id by removing leading hash char
-            _referenced_node_id = self._node.attrib.get("LINK","")[1:]
+            _referenced_node_id = self._node.get("LINK","")[1:]
 
             try:
                 # find node
                 _node = self._map.find_nodes(id=_referenced_node_id)[0]
 
                 # create Node instance
-                fpnode = Node(_node._node, self._map)
-
-                # update branch reference in case of detached node
-                if not self.is_root_node and not self.is_map_node:
-                    fpnode._map     = None
-                    fpnode._branch  = self._branch
+                fpnode = self._wrap(_node._node)
 
                 # return it to user
                 return fpnode
@@ -1282,7 +1490,7 @@ class Node(object):
 
     @property
     def hyperlink(self):
-        return self._node.attrib.get("LINK","")
+        return self._node.get("LINK","")
 
 
     @hyperlink.setter
@@ -1317,7 +1525,7 @@ class Node(object):
         hook = self._node.find('hook')
 
         # get uri attribute
-        uri = hook.attrib.get("URI", "")
+        uri = hook.get("URI", "")
 
         # sanitize uri
         uri = uri.replace("file://", "")
@@ -1350,7 +1558,7 @@ class Node(object):
         hook = self._node.find('hook')
 
         # get uri attribute
-        size = hook.attrib.get("SIZE", "")
+        size = hook.get("SIZE", "")
 
         return size
 
@@ -1389,17 +1597,15 @@ class Node(object):
         hook = self._node.find('hook')
         if hook is None:
 
-            # create hook element
-            hook = ET.Element(
+            # create hook element within node's children
+            hook = ET.SubElement(
+                    self._node,
                     "hook",
                     URI=link,
                     SIZE=str(size),
                     NAME='ExternalObject',
                     )
 
-            # add hook to node's children
-            self._node.append(hook)
-
         else:
 
             # just override attributes
@@ -1423,39 +1629,29 @@ class Node(object):
 
     @property
     def id(self):
-        return self._node.attrib['ID']
+        return self._node.get('ID', '')
 
     @id.setter
     def id(self, strId):
 
-        # ensure type
-        if not type(strId) == str:
-            strId = str(strId)
-
         # check required format
-        if not strId.lower().startswith('id_'):
-            print('[ INFO   : in Freeplane, an ID must start with "ID_" and contain a number string.')
-            # correct ID format
-            strId = "ID_"+strId
-
-        if not strId[len('id_'):].isnumeric():
-            print('[ WARNING: in Freeplane, an ID must have a certain format. ignoring ID change request.')
+        strId = get_valid_node_id(strId)
+        if strId is None:
             return False
 
         # set new ID
         self._node.attrib["ID"] = strId
+        if self._map is not None:
+            self._map._register_id(self._node)
         return True
 
     @property
     def attributes(self):
-        _attribute = {}
-        _lst = self._node.findall('attribute')
-        for _attr in _lst:
-            _name = _attr.get('NAME', '')
-            _value = _attr.get('VALUE', '')
-            if _name:
-                _attribute[_name] = _value
-        return _attribute
+        return {
+                _attr.get('NAME'): _attr.get('VALUE', '')
+                for _attr in self._node.iterchildren('attribute')
+                if _attr.get('NAME')
+                }
 
 
     def set_attribute(self,
@@ -1473,32 +1669,27 @@ class Node(object):
         # IF attribute key already exists
         #
 
-        if key.lower() in [ _.lower() for _ in self.attributes.keys() ]:
-
-            #
-            # overwrite existing value
-            #
-
-            _lst = self._node.findall('attribute')
-            for _attr in _lst:
-                _name = _attr.get('NAME', '')
-                if key.lower() == _name.lower():
-                    _attr.set('VALUE', value)
+        # overwrite the value of existing attributes with the same key. this
+        # is done within the same pass used to check for their existence.
+        _key = key.lower()
+        bFound = False
+        for _attr in self._node.iterchildren('attribute'):
+            if _attr.get('NAME', '').lower() == _key:
+                _attr.set('VALUE', value)
+                bFound = True
 
         #
         # ELSE
         #
 
-        else:
+        if not bFound:
 
             #
             # create new attribute
             #
 
-            _attrib = ET.Element("attribute", NAME=key, VALUE=value)
-
             # append element
-            _node = self._node.append(_attrib)
+            ET.SubElement(self._node, "attribute", NAME=key, VALUE=value)
 
 
     def add_attribute(self,
@@ -1519,19 +1710,15 @@ class Node(object):
         if key:
 
             # create element
-            _attrib = ET.Element("attribute", NAME=key, VALUE=value)
-
             # append element
-            _node = self._node.append(_attrib)
+            ET.SubElement(self._node, "attribute", NAME=key, VALUE=value)
 
         # return self.attributes
 
 
     @property
     def style(self):
-        if 'STYLE_REF' in self._node.attrib.keys():
-            return self._node.attrib['STYLE_REF']
-        return ""
+        return self._node.get('STYLE_REF', '')
 
     @style.setter
     def style(self, strStyle):
@@ -1577,10 +1764,7 @@ class Node(object):
         if self._map is not None:
 
             # check with existing styles
-            for _stylename in self._map.styles.keys():
-                if _stylename.lower() == strStyle.lower():
-                    break
-            else:
+            if strStyle.lower() not in self._map._get_style_names():
                 print('[ WARNING: style "' + strStyle + '" not found in mindmap. make sure, style exists. ]')
 
         # set style reference in XML node
@@ -1592,17 +1776,17 @@ class Node(object):
     @property
     def creationdate(self):
 
-        # check for TEXT attribute
-        if self._node.get('CREATED'):
+        # read out attribute content
+        text = self._node.get('CREATED')
 
-            # read out text content
-            text = self._node.attrib['CREATED']
+        # check for content
+        if text:
 
             # convert to float time value
             _time = float(text)/1000
 
-            # return datetime value
-            return datetime.datetime.fromtimestamp(_time).timetuple()
+            # return local time value
+            return time.localtime(_time)
 
         return tuple()
 
@@ -1610,17 +1794,17 @@ class Node(object):
     @property
     def modificationdate(self):
 
-        # check for TEXT attribute
-        if self._node.get('MODIFIED'):
+        # read out attribute content
+        text = self._node.get('MODIFIED')
 
-            # read out text content
-            text = self._node.attrib['MODIFIED']
+        # check for content
+        if text:
 
             # convert to float time value
             _time = float(text)/1000
 
-            # return datetime value
-            return datetime.datetime.fromtimestamp(_time).timetuple()
+            # return local time value
+            return time.localtime(_time)
 
         return tuple()
 
@@ -1655,7 +1839,7 @@ class Node(object):
                 # check for reference to internal node content
                 #
 
-                _match=re.match(r'^.*ID_([\d]+)\.text.*', _text)
+                _match = RE_CORELINK.match(_text)
                 if _match:
                     return 'ID_' + _match.group(1)
 
@@ -1668,17 +1852,18 @@ class Node(object):
     @property
     def comment(self):
 
-        # check for existence of child
-        if not self._node.find('node') is None:
+        # leaf nodes have no comment
+        if not len(self._node):
+            return ""
 
-            # get first child
-            node = self._node.find('node')
+        # get first child
+        node = self._node.find('node')
 
-            # check for TEXT attribute
-            if not node.get('TEXT') is None:
+        # check for existence of child
+        if node is not None:
 
-                # read out text content
-                return node.attrib['TEXT']
+            # read out text content if TEXT attribute present
+            return node.get('TEXT', '')
 
         return ""
 
@@ -1688,10 +1873,14 @@ class Node(object):
 
         _text = ''
 
+        # leaf nodes have no details
+        if not len(self._node):
+            return _text
+
         # check for details node
-        _lstDetailsNodes = self._node.findall("./richcontent[@TYPE='DETAILS']")
-        if _lstDetailsNodes:
-            _text = ''.join(_lstDetailsNodes[0].itertext()).strip()
+        _details = get_richcontent_element(self._node, 'DETAILS')
+        if _details is not None:
+            _text = ''.join(_details.itertext()).strip()
 
         return _text
 
@@ -1700,21 +1889,15 @@ class Node(object):
     def details(self, strDetails):
 
         # remove existing details element
-        _lstDetailsNodes = self._node.findall("./richcontent[@TYPE='DETAILS']")
-        if _lstDetailsNodes:
-            self._node.remove(_lstDetailsNodes[0])
+        _details = get_richcontent_element(self._node, 'DETAILS')
+        if _details is not None:
+            self._node.remove(_details)
 
         # create new details element
         if strDetails:
 
             # build html structure
-            _element = ET.Element("richcontent", TYPE='DETAILS')
-            _html = ET.SubElement(_element, "html")
-            _head = ET.SubElement(_html, "head")
-            _body = ET.SubElement(_html, "body")
-            for strLine in strDetails.split('\n'):
-                _p    = ET.SubElement(_body, "p")
-                _p.text = strLine
+            _element = get_new_richcontent_element('DETAILS', strDetails)
             # _element.text = \
                 # '\n' + \
                 # '<html>\n' + \
@@ -1745,10 +1928,14 @@ class Node(object):
 
         _text = ''
 
+        # leaf nodes have no notes
+        if not len(self._node):
+            return _text
+
         # check for notes node
-        _lstNotesNodes = self._node.findall("./richcontent[@TYPE='NOTE']")
-        if _lstNotesNodes:
-            _text = ''.join(_lstNotesNodes[0].itertext()).strip()
+        _notes = get_richcontent_element(self._node, 'NOTE')
+        if _notes is not None:
+            _text = ''.join(_notes.itertext()).strip()
 
         return _text
 
@@ -1763,21 +1950,15 @@ class Node(object):
         """
 
         # remove existing notes element
-        _lstNotesNodes = self._node.findall("./richcontent[@TYPE='NOTE']")
-        if _lstNotesNodes:
-            self._node.remove(_lstNotesNodes[0])
+        _notes = get_richcontent_element(self._node, 'NOTE')
+        if _notes is not None:
+            self._node.remove(_notes)
 
         # create new notes element
         if strNotes:
 
             # build html structure
-            _element = ET.Element("richcontent", TYPE='NOTE')
-            _html = ET.SubElement(_element, "html")
-            _head = ET.SubElement(_html, "head")
-            _body = ET.SubElement(_html, "body")
-            for strLine in strNotes.split('\n'):
-                _p    = ET.SubElement(_body, "p")
-                _p.text = strLine
+            _element = get_new_richcontent_element('NOTE', strNotes)
 
             # append element
             _node = self._node.append(_element)
@@ -1788,9 +1969,11 @@ class Node(object):
 
         # if non-detached node
         if self.is_map_node:
-            # ensure existing parent
-            if self._node in self._map._parentmap.keys():
-                return Node(self._map._parentmap[self._node], self._map)
+            # ensure existing parent. lxml keeps track of the parent of
+            # every element within the map's XML tree.
+            _parent = self._node.getparent()
+            if _parent is not None:
+                return self._map._get_node(_parent)
             else:
                 return None
 
@@ -1817,12 +2000,7 @@ class Node(object):
         if _previous is not None:
 
             # create Node instance
-            fpnode = Node(_previous, self._map)
-
-            # update branch reference in case of detached node
-            if not self.is_root_node and not self.is_map_node:
-                fpnode._map     = None
-                fpnode._branch  = self._branch
+            fpnode = self._wrap(_previous)
 
             # append node object
             return fpnode
@@ -1838,12 +2016,7 @@ class Node(object):
         if _next is not None:
 
             # create Node instance
-            fpnode = Node(_next, self._map)
-
-            # update branch reference in case of detached node
-            if not self.is_root_node and not self.is_map_node:
-                fpnode._map     = None
-                fpnode._branch  = self._branch
+            fpnode = self._wrap(_next)
 
             # append node object
             return fpnode
@@ -1853,13 +2026,11 @@ class Node(object):
 
     @property
     def icons(self):
-        _icons = []
-        _lst = self._node.findall('icon')
-        for _icon in _lst:
-            _name = _icon.get('BUILTIN', '')
-            if _name:
-                _icons.append(_name)
-        return _icons
+        return [
+                _name
+                for _name in (_icon.get('BUILTIN') for _icon in self._node.iterchildren('icon'))
+                if _name
+                ]
 
 
     def add_icon(self,
@@ -1878,10 +2049,7 @@ class Node(object):
 
         if icon:
 
-            _icon = ET.Element('icon')
-            _icon.attrib['BUILTIN'] = icon
-
-            self._node.append(_icon)
+            ET.SubElement(self._node, 'icon', BUILTIN=icon)
 
         # return self.icons
 
@@ -1917,42 +2085,43 @@ class Node(object):
 
         if icon:
 
-            _icons = []
-            _lst = self._node.findall('icon')
-            for _icon in _lst:
-
-                if _icon.get('BUILTIN', '').lower() == icon.lower():
+            # look for the first icon with a case-insensitively matching name
+            _icon_lower = icon.lower()
+            _match = None
+            for _icon in self._node.iterchildren('icon'):
+                if _icon.get('BUILTIN', '').lower() == _icon_lower:
+                    _match = _icon
+                    break
 
 
 
 
-                    #
-                    # remove icon from node's icon list
-                    #
+            #
+            # remove icon from node's icon list
+            #
 
-                    self._node.remove(_icon)
-                    break
+            if _match is not None:
+                self._node.remove(_match)
 
         # return self.icons
 
 
     @property
     def children(self):
-        lstNodesRet = []
-        for _node in  self._node.findall("./node"):
 
-            # create Node instance
-            fpnode = Node(_node, self._map)
+        # Node instances are created on access
+        return NodeView(list(self._node.iterchildren('node')), self._wrap)
 
-            # update branch reference in case of detached node
-            if not self.is_root_node and not self.is_map_node:
-                fpnode._map     = None
-                fpnode._branch  = self._branch
 
-            # append node object
-            lstNodesRet.append(fpnode)
+    def iter_children(self):
+        """
+        iterate over the node's children. in contrast to the children
+        property, the Node instances are created only as far as they are
+        requested by the caller.
+        """
 
-        return lstNodesRet
+        for _child in self._node.iterchildren('node'):
+            yield self._wrap(_child)
 
 
     @property
@@ -1965,33 +2134,22 @@ class Node(object):
 
 
     def get_child_by_index(self, idx=0):
-        # check if node has children
-        _children = self._node.findall("./node")
-        if len(_children):
-            # run through all child nodes
-            for _i, _child in enumerate(_children):
-                # check for matching index
-                if _i == idx:
-
-                    # create Node instance
-                    fpnode = Node(_child, self._map)
-
-                    # update branch reference in case of detached node
-                    if not self.is_root_node and not self.is_map_node:
-                        fpnode._map     = None
-                        fpnode._branch  = self._branch
-
-                    # append node object
-                    return fpnode
-
-            # index not found
-            else:
-                return None
-        # no children present
-        else:
+
+        # negative index values are not supported
+        if idx < 0:
             return None
 
-    def get_indexchain_until(self, node):
+        # skip child nodes until the index is reached
+        _child = next(itertools.islice(self._node.iterchildren('node'), idx, None), None)
+        if _child is not None:
+
+            # create Node instance
+            return self._wrap(_child)
+
+        # index not found or no children present
+        return None
+
+    def get_indexchain_until(self, node):
         """
         determine the list of index values which have to be used in order to
         find the given node. the process is started from the self object and
@@ -2071,17 +2229,12 @@ class Node(object):
 
     @property
     def is_comment(self):
-        if not self._node.get('STYLE_REF') is None \
-                and self._node.attrib['STYLE_REF'] == 'klein und grau':
-            return True
-        return False
+        return self._node.get('STYLE_REF') == 'klein und grau'
 
 
     @property
     def has_children(self):
-        if not self._node.findall('./node'):
-            return False
-        return True
+        return self._node.find('node') is not None
 
 
     def find_nodes(
@@ -2099,24 +2252,66 @@ class Node(object):
             keep_link_specials=False,
             ):
 
+        # collect all matching nodes. the Node instances are created on
+        # access.
+        return NodeView(
+            self._find_xml_nodes(
+                xmlnode=self._node,
+                axis='descendant-or-self' if find_in_self else 'descendant',
+                id=id,
+                core=core,
+                attrib=attrib,
+                details=details,
+                notes=notes,
+                link=link,
+                icon=icon,
+                exact=exact,
+                caseinsensitive=caseinsensitive,
+                keep_link_specials=False,
+            ),
+            self._wrap,
+        )
+
+
+    def iter_nodes(
+            self,
+            core='',
+            link='',
+            id='',
+            attrib='',
+            details='',
+            notes='',
+            icon='',
+            exact=False,
+            caseinsensitive=False,
+            find_in_self=False,
+            keep_link_specials=False,
+            ):
+        """
+        iterate over the nodes below the node matching all given arguments.
+        in contrast to find_nodes, the nodes are searched only as far as they
+        are requested by the caller.
+        """
+
 
 
 
         #
-        # find list of nodes below node
+        # find nodes below node
         #
 
-        # list all nodes regardless of further properties
-        # starting from below the current node
-        lstXmlNodes = self._node.findall(".//node")
-
-        # add self to the list of nodes if desired
+        # select all nodes matching the given arguments starting from below
+        # the current node or including the current node itself if desired.
+        # as far as possible, the checks are done by the XPath engine while
+        # selecting the nodes.
         if find_in_self:
-            lstXmlNodes = [ self._node ] + lstXmlNodes
+            _axis = 'descendant-or-self'
+        else:
+            _axis = 'descendant'
 
-        # do the checks on the base of the list
-        lstXmlNodes = reduce_node_list(
-            lstXmlNodes=lstXmlNodes,
+        for _node in self._iter_xml_nodes(
+            xmlnode=self._node,
+            axis=_axis,
             id=id,
             core=core,
             attrib=attrib,
@@ -2127,30 +2322,10 @@ class Node(object):
             exact=exact,
             caseinsensitive=caseinsensitive,
             keep_link_specials=False,
-        )
-
-
-
-
-        #
-        # create Node instances
-        #
-
-        lstNodesRet = []
-        for _node in lstXmlNodes:
+        ):
 
             # create Node instance
-            fpnode = Node(_node, self._map)
-
-            # update branch reference in case of detached node
-            if not self.is_root_node and not self.is_map_node:
-                fpnode._map     = None
-                fpnode._branch  = self._branch
-
-            # append node object
-            lstNodesRet.append(fpnode)
-
-        return lstNodesRet
+            yield self._wrap(_node)
 
 
     def find_children(
@@ -2174,12 +2349,12 @@ class Node(object):
         # find list of nodes directly below node
         #
 
-        # list all nodes regardless of further properties
-        lstXmlNodes = self._node.findall("./node")
-
-        # do the checks on the base of the list
-        lstXmlNodes = reduce_node_list(
-            lstXmlNodes=lstXmlNodes,
+        # select all child nodes matching the given arguments. as far as
+        # possible, the checks are done by the XPath engine while selecting
+        # the nodes.
+        lstXmlNodes = self._find_xml_nodes(
+            xmlnode=self._node,
+            axis='child',
             id=id,
             core=core,
             attrib=attrib,
@@ -2199,21 +2374,8 @@ class Node(object):
         # create Node instances
         #
 
-        lstNodesRet = []
-        for _node in lstXmlNodes:
-
-            # create Node instance
-            fpnode = Node(_node, self._map)
-
-            # update branch reference in case of detached node
-            if not self.is_root_node and not self.is_map_node:
-                fpnode._map     = None
-                fpnode._branch  = self._branch
-
-            # append node object
-            lstNodesRet.append(fpnode)
-
-        return lstNodesRet
+        # Node instances are created on access
+        return NodeView(lstXmlNodes, self._wrap)
 
 
     def getSubText(self, token=''):
@@ -2233,7 +2395,7 @@ class Node(object):
         if not token == "":
 
             # check for token node
-            tokennode = self._node.findall("./node[@TEXT='" + token + "']")
+            tokennode = XPATH_CHILD_BY_TEXT(self._node, text=token)
             if not tokennode == []:
 
                 # go further to find the comment text
@@ -2307,7 +2469,7 @@ class Node(object):
 
         # check if object is child within map
         if self.is_map_node or self.is_root_node:
-            if attached_node._node in self._map._parentmap.keys():
+            if self._map._contains(attached_node._node):
                 print('[ WARNING: node "' + str(attached_node) + \
                         '" already attached to a map. NOTHING DONE. ]')
                 return False
@@ -2346,18 +2508,6 @@ class Node(object):
             # is to be the same as the map object attached to
             attached_node._map = self._map
 
-            #
-            # set parent node within map's parentmap
-            #
-
-            self._map._parentmap[attached_node._node] = self._node
-
-            #
-            # append map's parent dict from branch's dict
-            #
-
-            self._map._parentmap.update(attached_node._branch._parentmap)
-
             #
             # save new map reference in old branch object
             #
@@ -2376,6 +2526,10 @@ class Node(object):
             else:
                 self._node.insert(pos, attached_node._node)
 
+            # make the attached nodes known to the map's id index
+            for _node in attached_node._node.iter('node'):
+                self._map._register_id(_node)
+
             # leave function
             # return attached_node
             return True
@@ -2395,6 +2549,7 @@ class Node(object):
 
             # the pointer to the map object of the attached node
             # is to be the same as the map object attached to
+            _old_branch = attached_node._branch
             attached_node._branch = self._branch
 
             #
@@ -2404,10 +2559,10 @@ class Node(object):
             self._branch._parentmap[attached_node._node] = self._node
 
             #
-            # append new branch's parent dict from branch's dict
+            # append new branch's parent dict from old branch's dict
             #
 
-            self._branch._parentmap.update(attached_node._branch._parentmap)
+            self._branch._merge(_old_branch)
 
             #
             # insert appropriate XML nodes
@@ -2479,19 +2634,10 @@ class Node(object):
 
 
             #
-            # create arrow link node
-            #
-
-            _node = ET.Element('arrowlink')
-
-
-
-
-            #
-            # append arrow link node to node object
+            # create arrow link node within node object
             #
 
-            self._node.append(_node)
+            _node = ET.SubElement(self._node, 'arrowlink')
 
 
 
@@ -2587,21 +2733,16 @@ class Node(object):
         :returns:       list of Node elements
         """
         lstNodesRet = []
-        for _arrowlink in  self._node.findall("./arrowlink"):
+        for _arrowlink in self._node.iterchildren('arrowlink'):
 
             # get the destination id of target node
-            _nodeid = _arrowlink.attrib.get('DESTINATION', "")
+            _nodeid = _arrowlink.get('DESTINATION', "")
 
             # find node in local mindmap
-            _xmlnode = self._map._root.find('.//node[@ID="' + _nodeid + '"]')
+            _xmlnode = self._map._get_element_by_id(_nodeid)
 
             # create target Node instance
-            fpnode = Node(_xmlnode, self._map)
-
-            # update branch reference in case of detached node
-            if not self.is_root_node and not self.is_map_node:
-                fpnode._map     = None
-                fpnode._branch  = self._branch
+            fpnode = self._wrap(_xmlnode)
 
             # append node object
             lstNodesRet.append(fpnode)
@@ -2638,7 +2779,7 @@ class Node(object):
             _nodeid = ident.id
 
         # check for node id to be removed from arrowlinks
-        _xmlarrowlinks = self._node.findall('./arrowlink[@DESTINATION="' + _nodeid + '"]')
+        _xmlarrowlinks = XPATH_ARROWLINKS_TO(self._node, id=_nodeid)
 
         # remove arrowlink
         if len(_xmlarrowlinks) <= 0:
@@ -2659,17 +2800,12 @@ class Node(object):
 
         # find xmlnodes in local mindmap
         _nodeid = self.id
-        _xmlarrowlinks = self._map._root.findall('.//arrowlink[@DESTINATION="' + _nodeid + '"]')
+        _xmlarrowlinks = XPATH_ALL_ARROWLINKS_TO(self._map._root, id=_nodeid)
 
         for _xmlarrowlink in _xmlarrowlinks:
 
             # create target Node instance
-            fpnode = Node(_xmlarrowlink.getparent(), self._map)
-
-            # update branch reference in case of detached node
-            if not self.is_root_node and not self.is_map_node:
-                fpnode._map     = None
-                fpnode._branch  = self._branch
+            fpnode = self._wrap(_xmlarrowlink.getparent())
 
             # append node object
             lstNodesRet.append(fpnode)
@@ -2696,31 +2832,23 @@ class Node(object):
         # create and init element
         #
 
-        _node = ET.Element('node')
-        node = Node(_node, self._map)
-        node.plaintext = core
-
-
-
-
-        #
-        # overwrite standard id
-        #
-
-        if id:
-            node.id = id
-            if not node.id == id:
-                return None
-
-
-
+        # all XML attributes known in advance are set when creating the
+        # element. the creation and modification dates as well as a missing
+        # node id are added when creating the Node object.
+        _attrib = get_new_node_attributes(core, link, id)
+        if _attrib is None:
+            return None
 
-        #
-        # set link portion
-        #
+        # set node's position within children
+        if pos == -1:
+            _node = ET.SubElement(self._node, 'node', _attrib)
+        else:
+            _node = ET.Element('node', _attrib)
+            self._node.insert(pos, _node)
 
-        if link:
-            node.hyperlink = link
+        node = Node(_node, self._map)
+        if self._map is not None:
+            self._map._register_id(_node)
 
 
 
@@ -2735,29 +2863,13 @@ class Node(object):
 
 
 
-        #
-        # set node's position within children
-        #
-
-        if pos == -1:
-            self._node.append(_node)
-        else:
-            self._node.insert(pos, _node)
-
-
-
-
         #
         # update parentmap dict
         #
 
-        # check if this node is attached to a map
-        if self.is_root_node or self.is_map_node:
-
-            # add this object as parent to new object
-            self._map._parentmap[_node] = self._node
-
-        else:
+        # parents within a map are tracked by lxml itself. so, only nodes
+        # within a detached branch need to be registered.
+        if not (self.is_root_node or self.is_map_node):
 
             # create _branch and _parentmap nodes in new child
             node._branch = self._branch
@@ -2789,29 +2901,23 @@ class Node(object):
         # create and init element
         #
 
-        _node = ET.Element('node')
-        node = Node(_node, self._map)
-        node.plaintext = core
-
-
-
-
-        # overwrite standard id
-        if id:
-            node.id = id
-            if not node.id == id:
-                # print("[ WARNING: node id must follow Freplane's format rules. nothing done. ]")
-                return None
-
-
-
+        # all XML attributes known in advance are set when creating the
+        # element. the creation and modification dates as well as a missing
+        # node id are added when creating the Node object.
+        _attrib = get_new_node_attributes(core, link, id)
+        if _attrib is None:
+            return None
 
-        #
-        # set link portion
-        #
+        # set node's position within siblings
+        if pos == -1:
+            _node = ET.SubElement(self._node.getparent(), 'node', _attrib)
+        else:
+            _node = ET.Element('node', _attrib)
+            self._node.getparent().insert(pos, _node)
 
-        if link:
-            node.hyperlink = link
+        node = Node(_node, self._map)
+        if self._map is not None:
+            self._map._register_id(_node)
 
 
 
@@ -2826,30 +2932,17 @@ class Node(object):
 
 
 
-        #
-        # set node's position within siblings
-        #
-
-        if pos == -1:
-            self._node.getparent().append(_node)
-        else:
-            self._node.getparent().insert(pos, _node)
-
-
-
-
         #
         # update parentmap dict
         #
 
-        # check if this node is attached to a map
+        # check if this node is attached to a map. parents within a map are
+        # tracked by lxml itself.
         if self.is_root_node or self.is_map_node:
-
-            # add this object as parent to new object
-            self._map._parentmap[_node] = self._node.getparent()
+            pass
 
         # check if this node is attached to a branch
-        elif self._node in self._branch._parentmap.keys():
+        elif self._node in self._branch._parentmap:
             self._branch._parentmap[_node] = self._node.getparent()
 
         else:
@@ -2878,20 +2971,71 @@ def update_date_attribute_in_node(
     if node is None:
         return False
 
-    # calculate current date in milliseconds
-    _current_time = datetime.datetime.now()
-    _current_timestamp = str(int(_current_time.timestamp()*1000))
-
     # set modification date
     if date:
         node.set(key, date)
     else:
-        # set current date
-        node.set(key, _current_timestamp)
+        # set current date in milliseconds
+        node.set(key, str(int(time.time()*1000)))
 
     return True
 
 
+def get_new_node_attributes(core='', link='', id=''):
+
+    # return the XML attributes of a new node element or None if the given
+    # node id is not valid
+    _attrib = {}
+    if core is not None:
+        _attrib['TEXT'] = core
+    if id:
+        if not get_valid_node_id(id) == id:
+            # print("[ WARNING: node id must follow Freplane's format rules. nothing done. ]")
+            return None
+        _attrib['ID'] = id
+    if link:
+        _attrib['LINK'] = link
+    return _attrib
+
+
+def get_new_richcontent_element(type, text):
+
+    # return a new richcontent element of the given type holding the text as
+    # html body with one paragraph per line. the elements are created directly
+    # instead of parsing a markup string, so that the text is kept as is and
+    # needs no escaping.
+    _element = ET.Element('richcontent', TYPE=type)
+    _html = ET.SubElement(_element, 'html')
+    ET.SubElement(_html, 'head')
+    _body = ET.SubElement(_html, 'body')
+    for strLine in text.split('\n'):
+        ET.SubElement(_body, 'p').text = strLine
+    return _element
+
+
+def get_valid_node_id(strId):
+
+    # return the node id in Freeplane's format or None if it can't be
+    # brought into this format
+
+    # ensure type
+    if not type(strId) == str:
+        strId = str(strId)
+
+    # check required format
+    if not strId.lower().startswith('id_'):
+        print('[ INFO   : in Freeplane, an ID must start with "ID_" and contain a number string.')
+        # correct ID format
+        strId = "ID_"+strId
+
+    if not strId[len('id_'):].isnumeric():
+        print('[ WARNING: in Freeplane, an ID must have a certain format. ignoring ID change request.')
+        return None
+
+    return strId
+
+
+@functools.lru_cache(maxsize=8)
 def get_version_specific_file_encoding(version):
 
     # file encoding was changed from "latin1" or "windows-1252"
@@ -2899,10 +3043,11 @@ def get_version_specific_file_encoding(version):
 
     lstVersionItems = version.split('.')
     if len(lstVersionItems)>=2:
-        if int(lstVersionItems[0]) == 1 and int(lstVersionItems[1]) <= 6:
+        major, minor = map(int, lstVersionItems[:2])
+        if major == 1 and minor <= 6:
             # return "latin1"
             return "windows-1252"
-        elif int(lstVersionItems[0]) == 1 and int(lstVersionItems[1]) > 6:
+        elif major == 1 and minor > 6:
             return "utf-8"
 
 
@@ -2910,20 +3055,14 @@ def get_version_specific_file_encoding(version):
 
 def getCoreTextFromNode(node, bOnlyFirstLine=False):
 
-    # initialize text content
-    text = ""
-
-
-
-
     #
     # get TEXT attribute of node if present
     #
 
-    if not node.get('TEXT') is None:
-
-        # read out text content
-        text = node.attrib['TEXT']
+    # read out text content
+    text = node.get('TEXT')
+    if text is not None:
+        return text
 
 
 
@@ -2932,43 +3071,50 @@ def getCoreTextFromNode(node, bOnlyFirstLine=False):
     # strip text from RICHTEXT content if present
     #
 
-    elif not node.find('richcontent') is None:
+    # get richtext node
+    richnode = node.find('richcontent')
+    if richnode is None:
+        return ""
 
-        # get richtext node
-        richnode = node.find('richcontent')
+    # get html body node
+    htmltext = richnode.find('html/body')
 
-        # get html node
-        htmlnode = richnode.find('html')
+    # filter out plain text content
+    raw = "".join(htmltext.itertext())
 
-        # get html body node
-        htmltext = htmlnode.find('body')
 
-        # filter out plain text content
-        raw = "".join([x for x in htmltext.itertext()])
 
 
+    #
+    # filter first line if desired
+    #
 
+    if bOnlyFirstLine:
 
-        #
-        # filter first line if desired
-        #
+        # take only first line of text content. there is no need to split
+        # the remaining lines.
+        text = raw.strip().partition('\n')[0].strip()
 
-        if bOnlyFirstLine:
+    else:
 
-            # take only first line of text content
-            text = raw.strip().split('\n')[0].strip()
+        # remove <CR> and leading / trailing <SPACE>
+        text = raw.replace('\n', '').strip()
 
-        else:
+    return text
 
-            # replace <CR> and leading / trailing <SPACE>
-            raw__no_CR = raw.replace('\n', '')
-            text = raw__no_CR.strip()
 
-    return text
+@functools.lru_cache(maxsize=256)
+def compile_xpath(expression):
 
+    # the XPath expressions built for node searches only depend on the kind
+    # of the requested checks, as all values are handed over as variables.
+    # so, only a few distinct expressions occur and each is compiled once.
+    return ET.XPath(expression)
 
-def reduce_node_list(
-        lstXmlNodes=[],
+
+def iter_xml_nodes(
+        xmlnode=None,
+        axis='descendant',
         id='',
         core='',
         attrib='',
@@ -2981,130 +3127,396 @@ def reduce_node_list(
         keep_link_specials=False,
     ):
 
+    # the checks for a node's ATTRIBUTES and ICONS need to look into the
+    # node's child elements. these checks are added as predicates to an XPath
+    # expression selecting the nodes along the given axis. this way, they are
+    # evaluated within libxml2 while selecting the nodes. all other checks
+    # compare a single attribute value of the node itself, which is as fast
+    # in Python as in XPath, and are done by filter_xml_nodes afterwards. all
+    # values are handed over as XPath variables, so no quoting issues arise.
+    # the matching nodes are yielded one by one, so the caller can stop the
+    # search as soon as the wanted nodes were found.
+
+    lstPredicates = []
+    dicVariables = {}
+
+    # check for all ATTRIBUTES within a node. each key / value pair must be
+    # present as one of the node's attributes. keys and values are compared
+    # as strings, as done by get_node_predicates.
+    if attrib:
+        for _i, (_key, _value) in enumerate(attrib.items()):
+            lstPredicates.append(
+                    "[attribute[@NAME=$key{0} and @VALUE=$value{0}]]".format(_i))
+            dicVariables['key{}'.format(_i)] = str(_key)
+            dicVariables['value{}'.format(_i)] = str(_value)
+
+    # check for BUILTIN ICON at node
+    if icon:
+        lstPredicates.append("[icon[@BUILTIN=$icon]]")
+        dicVariables['icon'] = icon
+
+    # select nodes
+    if lstPredicates:
+        lstXmlNodes = compile_xpath(
+                axis + '::node' + ''.join(lstPredicates)
+                )(xmlnode, **dicVariables)
+
+    # or iterate them in case there is nothing to be checked within XPath
+    elif axis == 'child':
+        lstXmlNodes = xmlnode.iterchildren('node')
+    elif axis == 'descendant-or-self':
+        lstXmlNodes = xmlnode.iter('node')
+    else:
+        lstXmlNodes = xmlnode.iterdescendants('node')
+
+    # do the remaining checks node by node
+    yield from filter_xml_nodes(
+        lstXmlNodes,
+        id=id,
+        core=core,
+        details=details,
+        notes=notes,
+        link=link,
+        exact=exact,
+        caseinsensitive=caseinsensitive,
+        keep_link_specials=keep_link_specials,
+    )
+
+
+def find_xml_nodes(
+        xmlnode=None,
+        axis='descendant',
+        id='',
+        core='',
+        attrib='',
+        details='',
+        notes='',
+        link='',
+        icon='',
+        exact=False,
+        caseinsensitive=False,
+        keep_link_specials=False,
+    ):
+
+    # collect all matching nodes
+    return list(iter_xml_nodes(
+        xmlnode=xmlnode,
+        axis=axis,
+        id=id,
+        core=core,
+        attrib=attrib,
+        details=details,
+        notes=notes,
+        link=link,
+        icon=icon,
+        exact=exact,
+        caseinsensitive=caseinsensitive,
+        keep_link_specials=keep_link_specials,
+    ))
+
+
+def get_text_matcher(search, exact=False, caseinsensitive=False):
+
+    # return a function checking a text against the search string. exact
+    # comparisons check for equality, all others check if the search string
+    # is contained within the text, ignoring the case. the search string is
+    # normalized only once, here.
+    if exact and not caseinsensitive:
+        return lambda text: text == search
+    search = search.lower()
+    if exact:
+        return lambda text: text.lower() == search
+    return lambda text: search in text.lower()
+
+
+def get_attribute_matcher(name, search, exact=False, caseinsensitive=False):
+
+    # same as get_text_matcher, but checking the value of a node's XML
+    # attribute directly, which saves a function call per checked node
+    if exact and not caseinsensitive:
+        return lambda node: node.get(name, "") == search
+    search = search.lower()
+    if exact:
+        return lambda node: node.get(name, "").lower() == search
+    return lambda node: search in node.get(name, "").lower()
+
+
+def get_richcontent_element(node, type):
+
+    # return the node's first richcontent element of the given type, or None
+    # if there is none. the children are checked directly, as this stops at
+    # the first hit and is faster than evaluating an XPath predicate.
+    for _richcontent in node.iterchildren('richcontent'):
+        if _richcontent.get('TYPE') == type:
+            return _richcontent
+    return None
+
+
+def get_richcontent_text(node, type):
+
+    # return the plain text of the node's first richcontent element of the
+    # given type, or None if there is none
+    _richcontent = get_richcontent_element(node, type)
+    if _richcontent is not None:
+        return ''.join(_richcontent.itertext())
+    return None
+
+
+def get_node_predicates(
+        id='',
+        core='',
+        attrib='',
+        details='',
+        notes='',
+        link='',
+        icon='',
+        exact=False,
+        caseinsensitive=False,
+        keep_link_specials=False,
+    ):
+
+    # build one check function per given argument. the cheap checks, only
+    # looking at the node's own attributes, come first.
+
+    lstPredicates = []
+
     # check for identical ID
     if id:
-        _lstNodes = []
-        for _node in lstXmlNodes:
-            if id.lower() == _node.attrib.get("ID", "").lower():
-                _lstNodes.append(_node)
-        lstXmlNodes = _lstNodes
+        _id = id.lower()
+        lstPredicates.append(lambda node: node.get("ID", "").lower() == _id)
 
     # check for TEXT within a node's CORE
     if core:
-        _lstNodes = []
-        for _node in lstXmlNodes:
-            if exact:
-                if not caseinsensitive and core == _node.attrib.get("TEXT", ""):
-                    _lstNodes.append(_node)
-                elif caseinsensitive and core.lower() == _node.attrib.get("TEXT", "").lower():
-                    _lstNodes.append(_node)
-            else:
-                if core.lower() in _node.attrib.get("TEXT", "").lower():
-                    _lstNodes.append(_node)
-        lstXmlNodes = _lstNodes
+        lstPredicates.append(get_attribute_matcher("TEXT", core, exact, caseinsensitive))
 
-    # check for all ATTRIBUTES within a node
+    # check for all ATTRIBUTES within the node. each key / value pair must be
+    # present as one of the node's attributes, as done by iter_xml_nodes. keys
+    # and values are compared as strings.
     if attrib:
-        _lstNodes = []
-        # check for current list of nodes
-        for _node in lstXmlNodes:
-            # get attributes of node
-            for _attribnode in _node.findall("./attribute"):
-                _key = _attribnode.attrib.get("NAME", "")
-                _value = ""
-                if _key:
-                    _value = _attribnode.attrib.get("VALUE", "")
-                # check all given attributes
-                iFound = 0
-                for _check_key, _check_value in attrib.items():
-                    # key and value found in node
-                    if _key == _check_key and _value == _check_value:
-                        iFound += 1
-                # check for ALL matches
-                if iFound == len(attrib.items()):
-                    _lstNodes.append(_node)
-        lstXmlNodes = _lstNodes
+        _items = tuple((str(_key), str(_value)) for _key, _value in attrib.items())
+        lstPredicates.append(lambda node: all(
+                any(
+                    _attribnode.get("NAME", "") == _check_key
+                    and _attribnode.get("VALUE", "") == _check_value
+                    for _attribnode in node.iterchildren("attribute")
+                    )
+                for _check_key, _check_value in _items
+                ))
 
     # check for LINK within a node's LINK TEXT
     if link:
-        _lstNodes = []
-        for _node in lstXmlNodes:
-
-            # Freeplane internally, sometimes modifies link strings so that
-            # they contain "fixed" spaces. these can cause a string-based
-            # equality comparison to fail. for this case, strings like "%20"
-            # will by default be replaced with ordinary strings " " before
-            # comparison, here. using the switch "keep_link_specials", equality
-            # comparisons can be made without replacing these special
-            # characters.
-
-            if not keep_link_specials:
-                _link = _node.attrib.get("LINK", "").replace("\\","/").replace("%20", " ")
-            else:
-                _link = _node.attrib.get("LINK", "").replace("\\","/")
-
-            # now do the comparison
-            if exact:
-                # case-sensitive test
-                if not caseinsensitive and (link.replace("\\","/") == _link):
-                    _lstNodes.append(_node)
-                # case-insensitive test
-                elif caseinsensitive and (link.replace("\\","/").lower() == _link.lower()):
-                    _lstNodes.append(_node)
-            else:
-                if link.replace("\\", "/").lower() in _link.lower():
-                    _lstNodes.append(_node)
 
-        lstXmlNodes = _lstNodes
+        # Freeplane internally, sometimes modifies link strings so that they
+        # contain "fixed" spaces. these can cause a string-based equality
+        # comparison to fail. for this case, strings like "%20" will by
+        # default be replaced with ordinary strings " " before comparison,
+        # here. using the switch "keep_link_specials", equality comparisons
+        # can be made without replacing these special characters.
+
+        _link_matches = get_text_matcher(link.replace("\\", "/"), exact, caseinsensitive)
+        if not keep_link_specials:
+            lstPredicates.append(lambda node: _link_matches(
+                node.get("LINK", "").replace("\\", "/").replace("%20", " ")))
+        else:
+            lstPredicates.append(lambda node: _link_matches(
+                node.get("LINK", "").replace("\\", "/")))
 
     # check for BUILTIN ICON at node
     if icon:
-        _lstNodes = []
-        for _node in lstXmlNodes:
-            # check for icon node
-            _lstIconNodes = _node.findall("./icon[@BUILTIN='" + icon + "']")
-            if _lstIconNodes:
-                _lstNodes.append(_node)
-        lstXmlNodes = _lstNodes
+        lstPredicates.append(lambda node: any(
+            _icon.get("BUILTIN") == icon for _icon in node.iterchildren("icon")))
 
     # check for node's DETAILS
     if details:
-        _lstNodes = []
-        for _node in lstXmlNodes:
-            # check for details node
-            _lstDetailsNodes = _node.findall("./richcontent[@TYPE='DETAILS']")
-            if _lstDetailsNodes:
-                _text = ''.join(_lstDetailsNodes[0].itertext())
-                if exact:
-                    if not caseinsensitive and details == _text:
-                        _lstNodes.append(_node)
-                    elif caseinsensitive and details.lower() == _text.lower():
-                        _lstNodes.append(_node)
-                else:
-                    if details.lower() in _text.lower():
-                        _lstNodes.append(_node)
-        lstXmlNodes = _lstNodes
+        _details_match = get_text_matcher(details, exact, caseinsensitive)
+        def _check_details(node):
+            _text = get_richcontent_text(node, 'DETAILS')
+            return _text is not None and _details_match(_text)
+        lstPredicates.append(_check_details)
 
     # check for node's NOTES
     if notes:
-        _lstNodes = []
-        for _node in lstXmlNodes:
-            # check for notes node
-            _lstNotesNodes = _node.findall("./richcontent[@TYPE='NOTE']")
-            if _lstNotesNodes:
-                _text = ''.join(_lstNotesNodes[0].itertext())
-                if exact:
-                    if not caseinsensitive and notes == _text:
-                        _lstNodes.append(_node)
-                    elif caseinsensitive and notes.lower() == _text.lower():
-                        _lstNodes.append(_node)
-                else:
-                    if notes.lower() in _text.lower():
-                        _lstNodes.append(_node)
-        lstXmlNodes = _lstNodes
+        _notes_match = get_text_matcher(notes, exact, caseinsensitive)
+        def _check_notes(node):
+            _text = get_richcontent_text(node, 'NOTE')
+            return _text is not None and _notes_match(_text)
+        lstPredicates.append(_check_notes)
 
-    # and back
-    return lstXmlNodes
+    return lstPredicates
+
+
+def filter_xml_nodes(
+        xmlnodes,
+        id='',
+        core='',
+        attrib='',
+        details='',
+        notes='',
+        link='',
+        icon='',
+        exact=False,
+        caseinsensitive=False,
+        keep_link_specials=False,
+    ):
+
+    # all given checks are done for one node after the other. a node is
+    # yielded as soon as it passed all of them, and the remaining checks are
+    # skipped as soon as one of them fails. this way, no intermediate lists
+    # are built and the nodes are only walked once. the checks are chained
+    # as lazy filter iterators, which run their loops in C.
+
+    lstPredicates = get_node_predicates(
+        id=id,
+        core=core,
+        attrib=attrib,
+        details=details,
+        notes=notes,
+        link=link,
+        icon=icon,
+        exact=exact,
+        caseinsensitive=caseinsensitive,
+        keep_link_specials=keep_link_specials,
+    )
+
+    # node ids are unique within a map. so, the search ends with the first
+    # node carrying the requested id. its check is the first of the list.
+    if id:
+        xmlnodes = itertools.islice(filter(lstPredicates.pop(0), xmlnodes), 1)
+
+    for _predicate in lstPredicates:
+        xmlnodes = filter(_predicate, xmlnodes)
+
+    return iter(xmlnodes)
+
+
+def reduce_node_list(
+        lstXmlNodes=None,
+        id='',
+        core='',
+        attrib='',
+        details='',
+        notes='',
+        link='',
+        icon='',
+        exact=False,
+        caseinsensitive=False,
+        keep_link_specials=False,
+    ):
+
+    # no nodes given
+    if lstXmlNodes is None:
+        return []
+
+    # keep all nodes of the list which match the given arguments
+    return list(filter_xml_nodes(
+        lstXmlNodes,
+        id=id,
+        core=core,
+        attrib=attrib,
+        details=details,
+        notes=notes,
+        link=link,
+        icon=icon,
+        exact=exact,
+        caseinsensitive=caseinsensitive,
+        keep_link_specials=keep_link_specials,
+    ))
+
+
+def getTextFromSimpleRichcontent(richnode):
+
+    # most richcontent elements written by Freeplane consist of nothing more
+    # than a sequence of paragraphs, possibly containing line breaks, without
+    # any further formatting. for these, the text is taken directly from the
+    # XML element by walking it once, without having to serialize it and run
+    # a full HTML to MARKDOWN conversion. the result must be identical to the
+    # conversion's output. so, in case the richcontent holds any further
+    # formatting or text which html2text would escape, wrap or otherwise
+    # modify, None is returned and the caller is expected to do the full
+    # conversion.
+
+    # check for unformatted content
+    for _element in richnode.iter():
+        if _element.tag not in SIMPLE_HTML_TAGS:
+            return None
+
+    # get html body node
+    _body = richnode.find('html/body')
+    if _body is None \
+            or (_body.text and _body.text.strip()):
+        return None
+
+    # collect paragraphs
+    lstParagraphs = []
+    for _p in _body:
+        if not _p.tag == 'p' \
+                or (_p.tail and _p.tail.strip()):
+            return None
+
+        # collect paragraph's text portions in document order and split them
+        # into separate lines at line break elements
+        lstLines = [[]]
+        for _event, _element in ET.iterwalk(_p, events=('start', 'end')):
+            if _event == 'start':
+                if _element.tag == 'br':
+                    lstLines.append([])
+                elif _element.text:
+                    lstLines[-1].append(_element.text)
+            elif _element is not _p and _element.tail:
+                lstLines[-1].append(_element.tail)
+
+        # leave text portions to html2text which it would escape
+        for _line in lstLines:
+            for _portion in _line:
+                if RE_HTML2TEXT_SPECIALS.search(_portion):
+                    return None
+
+        # collapse whitespace within lines
+        lstLines = [ RE_WHITESPACE.sub(' ', ''.join(_line)).strip() for _line in lstLines ]
+
+        # leave empty lines and lines to be wrapped or kept as they are to
+        # html2text
+        for _line in lstLines:
+            if not _line \
+                    or len(_line) > HTML2TEXT_BODY_WIDTH - 2 \
+                    or RE_HTML2TEXT_NOWRAP.search(_line):
+                return None
+
+        lstParagraphs.append('  \n'.join(lstLines))
+
+    # leave empty content to html2text
+    if not lstParagraphs:
+        return None
+
+    return ''.join(_text + '\n\n' for _text in lstParagraphs)
+
+
+@functools.lru_cache(maxsize=1024)
+def convert_html_to_markdown(html):
+
+    # a new converter instance is used for each conversion, as html2text's
+    # converter keeps state (e.g. collected abbreviations) between calls. the
+    # html2text package is only imported when the first conversion is
+    # requested. as identical HTML contents (e.g. from copied nodes) always
+    # give identical results, the results of recent conversions are kept.
+
+    import html2text
+    return html2text.HTML2Text().handle(html)
+
+
+def unescape_lt_gt(text):
+
+    # only scan for entities if there might be any at all. the entity
+    # replacement itself is done within a single pass using the precompiled
+    # expression and a replacement function which is not re-created per call.
+
+    if '&' not in text:
+        return text
+    return RE_LT_GT_ENTITY.sub(_lt_gt_entity_replacement, text)
+
+
+def _lt_gt_entity_replacement(match):
+    return LT_GT_ENTITIES[match.group(1)]
 
 
 # OLD
@@ -3112,63 +3524,220 @@ def reduce_node_list(
 # read text paragraph from mindmap
 # CLI FUNCTIONS
 
+def getNodeByTypeAttribute(mindmap, strValue):
+
+    # return the node holding the attribute "type" with the given value. the
+    # mindmap's index is used as long as the indexed node still carries the
+    # attribute and is still part of the map. otherwise, it is rebuilt
+    # within a single pass over all matching attributes of the map, which are
+    # selected within libxml2 instead of being filtered in Python. index keys
+    # and requested values are interned, so that the key comparisons within
+    # repeated lookups are reduced to identity checks.
+
+    strValue = sys.intern(strValue)
+    _index = mindmap._root_attr_cache
+    node = _index.get(strValue)
+    if node is None \
+            or not XPATH_TYPE_ATTRIBUTE(node, v=strValue) \
+            or not mindmap._contains(node):
+        _index = mindmap._root_attr_cache = {}
+
+        # as the map was obviously modified, the dependent indexes might keep
+        # elements alive which are no longer part of the map. release them.
+        mindmap._text_cache = {}
+
+        for item in XPATH_ALL_TYPE_ATTRIBUTES(mindmap._root):
+            _index.setdefault(sys.intern(item.get('VALUE')), item.getparent())
+        node = _index.get(strValue)
+        if node is None:
+            raise KeyError('no node with type attribute "' + strValue + '" found')
+    return node
+
+
+def getNodeBelowByText(mindmap, parent, strText):
+
+    # return the first node below the given parent node carrying the given
+    # TEXT. the mindmap's index is used if it is still valid. otherwise, the
+    # parent's index is rebuilt within a single pass over those descendants
+    # carrying a TEXT at all, as selected within libxml2.
+
+    strText = sys.intern(strText)
+    node = mindmap._text_cache.get(parent, {}).get(strText)
+    if node is None \
+            or node.get('TEXT') != strText \
+            or parent not in node.iterancestors():
+        _index = mindmap._text_cache[parent] = {}
+        for item in XPATH_ALL_NODES_WITH_TEXT(parent):
+            _index.setdefault(sys.intern(item.get('TEXT')), item)
+        node = _index.get(strText)
+        if node is None:
+            raise KeyError('no node with text "' + strText + '" found')
+    return node
+
+
 def getText(self, strRootAttribute, strTitleText, strPortion):
 
-    # get list of all attributes
-    lstAttributes = self._mindmap.getElementsByTagName('attribute')
+    # instead of searching the tree on every call, the relevant nodes are
+    # indexed within a single pass and remembered within the mindmap object
+    # for subsequent calls. as the map might have been modified in the
+    # meantime, an index entry is only used if it still carries the requested
+    # content at the requested location. otherwise, the index is rebuilt.
 
     # search for ROOT ATTRIBUTE NODE
-    for item in lstAttributes:
-        if item.attributes['NAME'].value == 'type' and \
-                item.attributes['VALUE'].value == strRootAttribute:
-            rootnode = item.parentNode
-
-    # get list of all nodes below
-    lstNodes = rootnode.getElementsByTagName('node')
+    rootnode = getNodeByTypeAttribute(self, strRootAttribute)
 
-    # look for node containing TITLE STRING
-    for item in lstNodes:
-        if item.hasAttribute('TEXT'):
-            if item.getAttribute('TEXT') == strTitleText:
-                titlenode = item
+    # look for node below containing TITLE STRING
+    titlenode = getNodeBelowByText(self, rootnode, strTitleText)
 
-    # get list of all nodes below
-    lstNodes = titlenode.getElementsByTagName('node')
+    # look for node below containing PORTION STRING
+    portionnode = getNodeBelowByText(self, titlenode, strPortion)
 
-    # look for node containing PORTION STRING
-    for item in lstNodes:
-        if item.hasAttribute('TEXT'):
-            if item.getAttribute('TEXT') == strPortion:
-                portionnode = item
+    # look for first HTML content
+    richcontent = next(portionnode.iterdescendants('richcontent'), None)
 
     # if there is no richtext content ...
-    if not portionnode.getElementsByTagName('richcontent'):
+    if richcontent is None:
 
-        # get next following single node
-        textnode = portionnode.getElementsByTagName('node')[0]
+        # get first direct child node
+        textnode = portionnode.find('node')
+        if textnode is None:
+            raise KeyError('no text found below node "' + strPortion + '"')
 
         # get standard TEXT attribute
-        strText = textnode.getAttribute('TEXT')
+        strText = textnode.get('TEXT', '')
 
     else:
 
-        # look for HTML content
-        richcontents = portionnode.getElementsByTagName('richcontent')
+        # take text of unformatted paragraphs directly
+        strText = getTextFromSimpleRichcontent(richcontent)
 
-        # convert content to HTML
-        strHtml = richcontents[0].toxml()
+        # else, do full conversion
+        if strText is None:
 
-        # convert HTML to MARKDOWN ASCII
-        strText = html2text.html2text(strHtml)
+            # convert HTML to MARKDOWN ASCII
+            strText = convert_html_to_markdown(
+                    ET.tostring(richcontent, encoding='unicode'))
 
     # replace cryptic text passages
-    strText = strText.replace('&lt;', '<')
-    strText = strText.replace('&gt;', '>')
+    strText = unescape_lt_gt(strText)
 
     # return value back to caller
     return strText
 
 
+# DEMONSTRATION
+
+def test():
+    """
+    create an example mindmap demonstrating the main functionalities.
+    """
+
+    # strExamplePath = "example__code2mm__v1_8_11.mm"
+    # strExamplePath = "example__code2mm__v1_3_15.mm"
+    # mm = Mindmap(strExamplePath)
+    # dicStyles = mm.Styles
+    # print(dicStyles)
+    # mm.save(strExamplePath[:strExamplePath.rfind('.')] + '__saved.mm')
+
+
+
+
+    # create new mindmap
+    mm=Mindmap()
+
+    # get and print root node
+    rn=mm.rootnode
+    print(rn)
+
+    # change root node plain text
+    rn.plaintext = "ROOT NODE"
+    print(rn)
+
+
+
+
+    #
+    # create some nodes and branches
+    #
+
+    # create detached node
+    detach=mm.create_node("DETACHED")
+    print(detach)
+
+    # create detached node
+    detach2=mm.create_node("DETACHED2")
+    print(detach2)
+
+    # add node into 2nd detached branch
+    nd2=detach2.add_child("ADDED_TO_DETACHED2_AS_CHILD")
+    print(nd2)
+
+    # create detached node
+    detach3=mm.create_node("DETACHED3")
+    print(detach3)
+
+    # add node into 2nd detached branch
+    nd3=detach3.add_child("ADDED_TO_DETACHED3_AS_CHILD")
+    print(nd3)
+
+    # check parent node within branch
+    print(nd2.parent)
+
+    #
+    # create and attach some styles
+    #
+
+    # add style to mindmap
+    mm.add_style(
+            "klein und grau",
+            {
+                'color': '#999999',
+            })
+
+    # WARNING: apply non-existing style to detached branch node
+    nd2.style = "groß und grau"
+
+    #
+    # attach some nodes and styles
+    #
+
+    # attach detached3 branch head to detached node nd2
+    nd2.attach(detach3)
+
+    # WARNING: attach detached branch node to root node
+    rn.attach(nd2)
+
+    # attach single detached head to root node
+    rn.attach(detach)
+
+    # WARNING: apply existing style to detached branch node
+    detach2.style = "klein und grau"
+
+    # attach detached branch head to root node
+    rn.attach(detach2)
+
+    # apply existing style to map node
+    nd2.style = "klein und grau"
+
+    # WARNING: attach already attached branch head
+    rn.attach(detach)
+
+    # WARNING: attach already attached branch head to already attached former branch node
+    nd2.attach(detach)
+
+    #
+    # save mindmap into file
+    #
+
+    mm.save("example101.mm")
+
+
+# commands which can be invoked via the command line
+CLI_COMMANDS = {
+    'test': test,
+}
+
+
 #
 # execute this module code
 #
@@ -0,0 +1,187 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import freeplane
+
+
+class TestMembership(unittest.TestCase):
+
+    def setUp(self):
+        self.mindmap = freeplane.Mindmap()
+        self.node = self.mindmap.rootnode.add_child(core='child')
+
+    def test_map_elements_are_contained(self):
+        self.assertTrue(self.mindmap._contains(self.mindmap._root))
+        self.assertTrue(self.mindmap._contains(self.mindmap._rootnode))
+        self.assertTrue(self.mindmap._contains(self.node._node))
+
+    def test_removed_node_is_not_contained(self):
+        element = self.node._node
+        self.node.remove()
+        self.assertFalse(self.mindmap._contains(element))
+
+
+class TestIdIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.mindmap = freeplane.Mindmap()
+        self.node = self.mindmap.rootnode.add_child(core='child')
+        self.other = self.mindmap.rootnode.add_child(core='other')
+        # create the index before modifying the map
+        self.assertEqual(
+                [node.id for node in self.mindmap.find_nodes(id=self.node.id)],
+                [self.node.id],
+                )
+
+    def test_lookup_ignores_case(self):
+        self.assertEqual(len(self.mindmap.find_nodes(id=self.node.id.lower())), 1)
+
+    def test_removed_node_is_not_found(self):
+        strId = self.node.id
+        self.node.remove()
+        self.assertEqual(list(self.mindmap.find_nodes(id=strId)), [])
+        self.assertIsNone(self.mindmap._get_element_by_id(strId))
+
+    def test_changed_id(self):
+        strOldId = self.node.id
+        self.node.id = 'ID_123456789'
+        self.assertEqual(list(self.mindmap.find_nodes(id=strOldId)), [])
+        self.assertEqual(
+                [node.plaintext for node in self.mindmap.find_nodes(id='ID_123456789')],
+                ['child'],
+                )
+
+    def test_id_changed_outside_of_module(self):
+        strOldId = self.node.id
+        self.node._node.set('ID', 'ID_987654321')
+        self.assertEqual(list(self.mindmap.find_nodes(id=strOldId)), [])
+        self.assertEqual(len(self.mindmap.find_nodes(id='ID_987654321')), 1)
+
+    def test_arrowlink_to_removed_node(self):
+        self.other.add_arrowlink(self.node)
+        self.assertEqual(
+                [node.plaintext for node in self.other.arrowlinks],
+                ['child'],
+                )
+        self.node.remove()
+        self.assertIsNone(self.mindmap._get_element_by_id(self.node.id))
+
+    def test_created_id_does_not_collide(self):
+        strId = freeplane.Mindmap.create_node_id(self.mindmap)
+        self.assertIsNone(self.mindmap._get_element_by_id(strId))
+        self.node.id = strId
+        self.assertNotEqual(freeplane.Mindmap.create_node_id(self.mindmap), strId)
+
+
+
+class TestGetText(unittest.TestCase):
+
+    def add_document(self, strText):
+        section = self.mindmap.rootnode.add_child(core='doc')
+        section.set_attribute('type', 'doc')
+        part = section.add_child(core='Title').add_child(core='Part')
+        part.add_child(core=strText)
+        return section
+
+    def setUp(self):
+        self.mindmap = freeplane.Mindmap()
+
+    def test_text_below_typed_node(self):
+        self.add_document('first')
+        self.assertEqual(freeplane.getText(self.mindmap, 'doc', 'Title', 'Part'), 'first')
+
+    def test_removed_typed_node_is_not_used(self):
+        section = self.add_document('first')
+        self.assertEqual(freeplane.getText(self.mindmap, 'doc', 'Title', 'Part'), 'first')
+        section.remove()
+        self.add_document('second')
+        self.assertEqual(freeplane.getText(self.mindmap, 'doc', 'Title', 'Part'), 'second')
+
+
+
+class TestIcons(unittest.TestCase):
+
+    def setUp(self):
+        self.node = freeplane.Mindmap().rootnode.add_child(core='child')
+
+    def test_del_icon_removes_first_case_insensitive_match(self):
+        for strIcon in ('idea', 'YES', 'yes'):
+            self.node.add_icon(strIcon)
+        self.node.del_icon('yes')
+        self.assertEqual(self.node.icons, ['idea', 'yes'])
+        self.node.del_icon('IDEA')
+        self.assertEqual(self.node.icons, ['yes'])
+
+    def test_del_missing_icon(self):
+        self.node.add_icon('idea')
+        self.node.del_icon('yes')
+        self.assertEqual(self.node.icons, ['idea'])
+
+
+
+
+class TestNodeView(unittest.TestCase):
+
+    def setUp(self):
+        self.mindmap = freeplane.Mindmap()
+        root = self.mindmap.rootnode
+        for strCore in ('a', 'b', 'c'):
+            root.add_child(core=strCore)
+        self.children = root.children
+
+    def plaintexts(self, nodes):
+        return [node.plaintext for node in nodes]
+
+    def test_len(self):
+        self.assertEqual(len(self.children), 3)
+        self.assertEqual(len(self.mindmap.find_nodes(core='missing')), 0)
+
+    def test_indexing(self):
+        self.assertEqual(self.children[0].plaintext, 'a')
+        self.assertEqual(self.children[2].plaintext, 'c')
+        self.assertEqual(self.children[-1].plaintext, 'c')
+        self.assertEqual(self.children[-3].plaintext, 'a')
+        with self.assertRaises(IndexError):
+            self.children[3]
+        with self.assertRaises(IndexError):
+            self.children[-4]
+
+    def test_slicing(self):
+        self.assertIsInstance(self.children[1:], list)
+        self.assertEqual(self.plaintexts(self.children[1:]), ['b', 'c'])
+        self.assertEqual(self.plaintexts(self.children[::-1]), ['c', 'b', 'a'])
+        self.assertEqual(self.children[5:], [])
+
+    def test_iteration(self):
+        self.assertEqual(self.plaintexts(self.children), ['a', 'b', 'c'])
+        self.assertEqual(self.plaintexts(reversed(self.children)), ['c', 'b', 'a'])
+        self.assertIn(self.children[1], self.children)
+
+    def test_equality_with_sequences(self):
+        lstChildren = list(self.children)
+        self.assertEqual(self.children, lstChildren)
+        self.assertEqual(lstChildren, self.children)
+        self.assertEqual(self.children, tuple(lstChildren))
+        self.assertEqual(self.children, self.mindmap.rootnode.children)
+        self.assertNotEqual(self.children, lstChildren[:2])
+        self.assertNotEqual(self.children, 'abc')
+
+    def test_wrapper_reuse(self):
+        self.assertIs(self.children[0], self.children[0])
+        self.assertIs(self.children[0], self.mindmap.rootnode.children[0])
+        self.assertIs(
+                self.children[1],
+                self.mindmap.find_nodes(core='b', exact=True)[0],
+                )
+
+    def test_list_copy_is_modifiable(self):
+        lstChildren = list(self.children)
+        lstChildren.append(lstChildren[0])
+        self.assertEqual(len(lstChildren), 4)
+        self.assertEqual(len(self.children), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import os
+import sys
+import unittest
+
+import lxml.etree as ET
+import html2text
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import freeplane
+
+
+def richcontent(body):
+    return ET.fromstring(
+            '<richcontent TYPE="NOTE"><html><head/><body>'
+            + body
+            + '</body></html></richcontent>'
+            )
+
+
+class TestSimpleRichcontent(unittest.TestCase):
+
+    # the fast path must either give exactly html2text's output or leave the
+    # conversion to html2text by returning None
+
+    PARAGRAPHS = [
+        '<p>hello</p>',
+        '<p>\n      hello world\n    </p>',
+        '<p>first</p>\n    <p>second</p>',
+        '<p>  some   spaced\ttext  </p>',
+        '<p>' + 'word ' * 30 + '</p>',
+        '<p>1. item</p>',
+        '<p>- dash</p>',
+        '<p>+ plus</p>',
+        '<p>-- rule</p>',
+        '<p>a\\*b</p>',
+        '<p>x &amp; y</p>',
+        '<p>a &lt; b</p>',
+        '<p>non\xa0breaking</p>',
+        '<p>see [x](y)</p>',
+        '<p>a | b</p>',
+        '<p>* star</p>',
+        '<p></p>',
+        '<p>\n    </p>',
+        '',
+        ]
+
+    LINE_BREAKS = [
+        '<p>first<br/>second</p>',
+        '<p>\n      first\n      <br/>\n      second\n    </p>',
+        '<p>first <br/> second</p>\n    <p>third</p>',
+        '<p><br/>after leading break</p>',
+        '<p>before trailing break<br/></p>',
+        '<p>double<br/><br/>break</p>',
+        '<p>one<br/>1. two</p>',
+        '<p>one<br/>- two</p>',
+        '<p>one<br/>' + 'word ' * 30 + '</p>',
+        '<p>a <span>b</span> c<br/>d</p>',
+        ]
+
+    def assertMatchesHtml2text(self, body):
+        element = richcontent(body)
+        text = freeplane.getTextFromSimpleRichcontent(element)
+        if text is not None:
+            expected = html2text.html2text(ET.tostring(element, encoding='unicode'))
+            self.assertEqual(text, expected, body)
+
+    def test_paragraphs(self):
+        for body in self.PARAGRAPHS:
+            self.assertMatchesHtml2text(body)
+
+    def test_line_breaks(self):
+        for body in self.LINE_BREAKS:
+            self.assertMatchesHtml2text(body)
+
+    def test_line_breaks_take_fast_path(self):
+        self.assertEqual(
+                freeplane.getTextFromSimpleRichcontent(
+                    richcontent('<p>\n      first\n      <br/>\n      second\n    </p>')),
+                'first  \nsecond\n\n',
+                )
+
+    def test_plain_paragraphs_take_fast_path(self):
+        self.assertEqual(
+                freeplane.getTextFromSimpleRichcontent(
+                    richcontent('<p>\n      hello world\n    </p>')),
+                'hello world\n\n',
+                )
+
+    def test_long_paragraph_is_left_to_html2text(self):
+        self.assertIsNone(freeplane.getTextFromSimpleRichcontent(
+            richcontent('<p>' + 'word ' * 30 + '</p>')))
+
+    def test_escaped_line_starts_are_left_to_html2text(self):
+        for body in ('<p>1. item</p>', '<p>- dash</p>', '<p>+ plus</p>'):
+            self.assertIsNone(
+                    freeplane.getTextFromSimpleRichcontent(richcontent(body)),
+                    body,
+                    )
+
+
+
+class TestHtmlConversion(unittest.TestCase):
+
+    def test_conversions_are_independent(self):
+        # html2text's converter collects abbreviations while converting. they
+        # must not show up within the results of later conversions.
+        freeplane.convert_html_to_markdown.cache_clear()
+        freeplane.convert_html_to_markdown('<p><abbr title="t">AB</abbr></p>')
+        self.assertEqual(
+                freeplane.convert_html_to_markdown('<blockquote>q</blockquote><p>x</p>'),
+                '> q\n\nx\n\n',
+                )
+
+
+if __name__ == '__main__':
+    unittest.main()
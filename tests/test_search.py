@@ -0,0 +1,167 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import freeplane
+
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
+
+class TestAttributeSearch(unittest.TestCase):
+
+    # the XPath based selection and the Python predicates must agree on which
+    # nodes match an attribute search
+
+    def setUp(self):
+        self.mindmap = freeplane.Mindmap()
+        root = self.mindmap.rootnode
+        self.both = root.add_child(core='both')
+        self.both.set_attribute('k', 'v')
+        self.both.set_attribute('k2', 'v2')
+        self.single = root.add_child(core='single')
+        self.single.set_attribute('k', 'v')
+
+    def search_all_paths(self, attrib):
+        elements = list(self.mindmap._root.iter('node'))
+        return [
+            [node.id for node in self.mindmap.find_nodes(attrib=attrib)],
+            [node.id for node in self.mindmap.rootnode.find_nodes(attrib=attrib)],
+            [node.id for node in self.mindmap.rootnode.find_children(attrib=attrib)],
+            [node.id for node in self.mindmap.find_nodes_multi([{'attrib': attrib}])[0]],
+            [element.get('ID') for element in freeplane.reduce_node_list(elements, attrib=attrib)],
+            ]
+
+    def test_single_key(self):
+        expected = [self.both.id, self.single.id]
+        for result in self.search_all_paths({'k': 'v'}):
+            self.assertEqual(result, expected)
+
+    def test_multiple_keys_require_all_pairs(self):
+        expected = [self.both.id]
+        for result in self.search_all_paths({'k': 'v', 'k2': 'v2'}):
+            self.assertEqual(result, expected)
+
+    def test_non_string_value(self):
+        self.single.set_attribute('n', '5')
+        for result in self.search_all_paths({'n': 5}):
+            self.assertEqual(result, [self.single.id])
+
+    def test_no_match(self):
+        for result in self.search_all_paths({'k': 'v', 'k2': 'other'}):
+            self.assertEqual(result, [])
+
+
+
+
+class TestBulkSearch(unittest.TestCase):
+
+    # both ways of searching within find_nodes_bulk must give the same nodes
+    # as separate find_nodes calls
+
+    CORES = ['apple', 'APPLE', 'pie', 'apple pie', 'missing', '']
+
+    def setUp(self):
+        self.mindmap = freeplane.Mindmap()
+        root = self.mindmap.rootnode
+        root.add_child(core='Apple pie').add_child(core='pineapple')
+        root.add_child(core='cherry PIE')
+        root.add_child(core='plum')
+
+    def assertMatchesFindNodes(self, dicResult):
+        self.assertEqual(list(dicResult), self.CORES)
+        for core in self.CORES:
+            self.assertEqual(
+                    [node.id for node in dicResult[core]],
+                    [node.id for node in self.mindmap.find_nodes(core=core)],
+                    core,
+                    )
+
+    def test_without_ahocorasick(self):
+        with mock.patch.dict(sys.modules, {'ahocorasick': None}):
+            self.assertMatchesFindNodes(self.mindmap.find_nodes_bulk(self.CORES))
+
+    @unittest.skipUnless(HAS_AHOCORASICK, 'pyahocorasick is not installed')
+    def test_with_ahocorasick(self):
+        self.assertMatchesFindNodes(self.mindmap.find_nodes_bulk(self.CORES))
+
+    def test_no_cores(self):
+        self.assertEqual(self.mindmap.find_nodes_bulk(), {})
+
+
+
+
+class TestLazySearch(unittest.TestCase):
+
+    QUERIES = [
+        {'core': 'item'},
+        {'core': 'ITEM 1', 'caseinsensitive': True},
+        {'core': 'item 2', 'exact': True},
+        {'attrib': {'k': 'v'}},
+        {'icon': 'idea'},
+        {'core': 'missing'},
+        {},
+        ]
+
+    def setUp(self):
+        self.mindmap = freeplane.Mindmap()
+        self.branch = self.mindmap.rootnode.add_child(core='branch')
+        for i in range(5):
+            node = self.branch.add_child(core='item %d' % i)
+            if i % 2:
+                node.set_attribute('k', 'v')
+                node.add_icon('idea')
+
+    def count_wrapped_nodes(self):
+        original = freeplane.Mindmap._get_node
+        self.calls = 0
+
+        def get_node(mindmap, element):
+            self.calls += 1
+            return original(mindmap, element)
+
+        return mock.patch.object(freeplane.Mindmap, '_get_node', get_node)
+
+    def test_find_nodes_multi_matches_find_nodes(self):
+        lstResults = self.mindmap.find_nodes_multi(self.QUERIES)
+        self.assertEqual(len(lstResults), len(self.QUERIES))
+        for query, result in zip(self.QUERIES, lstResults):
+            self.assertEqual(
+                    [node.id for node in result],
+                    [node.id for node in self.mindmap.find_nodes(**query)],
+                    query,
+                    )
+
+    def test_iter_nodes_matches_find_nodes(self):
+        for query in self.QUERIES:
+            self.assertEqual(
+                    [node.id for node in self.mindmap.iter_nodes(**query)],
+                    [node.id for node in self.mindmap.find_nodes(**query)],
+                    query,
+                    )
+            self.assertEqual(
+                    [node.id for node in self.branch.iter_nodes(**query)],
+                    [node.id for node in self.branch.find_nodes(**query)],
+                    query,
+                    )
+
+    def test_map_iter_nodes_stops_early(self):
+        with self.count_wrapped_nodes():
+            node = next(self.mindmap.iter_nodes(core='item'))
+        self.assertEqual(node.plaintext, 'item 0')
+        self.assertEqual(self.calls, 1)
+
+    def test_node_iter_nodes_stops_early(self):
+        with self.count_wrapped_nodes():
+            node = next(self.branch.iter_nodes(core='item'))
+        self.assertEqual(node.plaintext, 'item 0')
+        self.assertEqual(self.calls, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()